@@ -0,0 +1,70 @@
+from sqlalchemy import text
+
+# builds, for every variant with transcripts, the gene-grouped document ibvl.views.snv_annotations serves.
+# one entry per transcript (and annotation), with its distinct consequences as an array ordered by severity,
+# like group_by_gene gives them; keys must match annotation_values_names in ibvl/views/snv_annotations.py
+documents_sql = """
+WITH consequences AS (
+    SELECT variant_transcript, jsonb_agg(consequence ORDER BY severity_number) AS consequences
+    FROM (
+        SELECT DISTINCT c.variant_transcript, s.consequence, s.severity_number
+        FROM variants_consequences c JOIN severities s ON s.id = c.severity
+    ) c
+    GROUP BY variant_transcript
+),
+cadd AS (
+    SELECT DISTINCT ON (variant) variant, cadd_intr, cadd_score FROM snvs ORDER BY variant, id
+),
+transcripts AS (
+    SELECT vt.variant, g.short_name AS gene, MIN(vt.id) AS first_seen,
+        jsonb_agg(jsonb_build_object(
+            'gene', g.short_name,
+            'transcript', t.transcript_id,
+            'consequence', COALESCE(c.consequences, '[]'::jsonb),
+            'impact', a.impact,
+            'biotype', t.biotype,
+            'database', t.transcript_type,
+            'hgvsc', vt.hgvsc,
+            'hgvsp', a.hgvsp,
+            'polyphen', a.polyphen,
+            'sift', a.sift,
+            'cadd intr', cadd.cadd_intr,
+            'cadd score', cadd.cadd_score
+        ) ORDER BY vt.id, a.id) AS transcripts
+    FROM variants_transcripts vt
+    JOIN transcripts t ON t.id = vt.transcript
+    JOIN genes g ON g.id = t.gene
+    LEFT JOIN variants_annotations a ON a.variant_transcript = vt.id
+    LEFT JOIN consequences c ON c.variant_transcript = vt.id
+    LEFT JOIN cadd ON cadd.variant = vt.variant
+    GROUP BY vt.variant, g.short_name
+)
+SELECT variant, jsonb_agg(jsonb_build_object('gene', gene, 'transcripts', transcripts) ORDER BY first_seen) AS annotations
+FROM transcripts
+GROUP BY variant
+"""
+
+def build_annotation_documents(engine, log=print):
+    """
+    bring variant_annotation_documents in line with the imported tables, in one transaction.
+    documents are upserted and stale ones deleted rather than the table truncated and refilled: TRUNCATE's
+    ACCESS EXCLUSIVE lock would block /api/annotations and /api/variant until the rebuild commits
+    """
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TEMP TABLE annotation_source ON COMMIT DROP AS " + documents_sql))
+        connection.execute(text("CREATE UNIQUE INDEX ON annotation_source (variant)"))
+        connection.execute(text("ANALYZE annotation_source"))
+        connection.execute(text(
+            "INSERT INTO variant_annotation_documents (variant, annotations) "
+            + "SELECT variant, annotations FROM annotation_source "
+            + "ON CONFLICT (variant) DO UPDATE SET annotations = EXCLUDED.annotations "
+            + "WHERE variant_annotation_documents.annotations IS DISTINCT FROM EXCLUDED.annotations"
+        ))
+        connection.execute(text(
+            "DELETE FROM variant_annotation_documents d "
+            + "WHERE NOT EXISTS (SELECT 1 FROM annotation_source s WHERE s.variant = d.variant)"
+        ))
+        count = connection.execute(text("SELECT COUNT(*) FROM annotation_source")).scalar()
+        connection.execute(text("DROP TABLE annotation_source"))
+        connection.execute(text("ANALYZE variant_annotation_documents"))
+    log("built annotation documents for " + str(count) + " variants")
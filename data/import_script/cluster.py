@@ -0,0 +1,33 @@
+from sqlalchemy import text
+
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# off by default: CLUSTER holds an ACCESS EXCLUSIVE lock while it rewrites the table, so every api read of it
+# waits until it's done. run it in a maintenance window with: python manage.py cluster_tables
+cluster_after_import = os.environ.get("CLUSTER_AFTER_IMPORT", "false").lower() == "true"
+
+# tables rewritten in the order of one of their indexes, so range scans read few pages
+cluster_indexes = {
+    "snvs": "snvs_chr_pos_idx",
+}
+
+def cluster_after_import_tables(engine, throttled=False, log=print):
+    """the end of an import: clusters only if CLUSTER_AFTER_IMPORT asks for it, and never after a throttled import"""
+    if not cluster_after_import:
+        log("not clustering " + ", ".join(cluster_indexes.keys()) + ", run python manage.py cluster_tables in a maintenance window")
+        return
+    if throttled:
+        # a throttled import shares the database with live traffic, which the lock would block
+        log("import throttling is on, not clustering " + ", ".join(cluster_indexes.keys()))
+        return
+    cluster_tables(engine, log)
+
+def cluster_tables(engine, log=print):
+    for table, index in cluster_indexes.items():
+        with engine.begin() as connection:
+            connection.execute(text("CLUSTER " + table + " USING " + index))
+            connection.execute(text("ANALYZE " + table))
+        log("clustered " + table + " on " + index)
@@ -14,12 +14,25 @@ import numpy as np
 import signal
 import sys
 import os
+import time
 from datetime import datetime
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 from django.conf import settings
+from django.db import DatabaseError
+from ibvl.models import DatasetGeneration
 
 from .import_utils import *
+from .vcf_utils import vcf_models, load_vcf_info_map, find_vcf_files, readVCF, estimate_vcf_records
+from .rebuild_maps import get_jobs_dir
+from .throttle import throttle, throttle_chunk
+from .search_index import build_search_index
+from .annotation_documents import build_annotation_documents
+from .worst_consequences import compute_worst_consequences
+from .cluster import cluster_after_import_tables
+from .summaries import refresh_summaries
+from .variant_bloom import build_variant_filter
+from .progress import start_progress, set_progress_file, set_progress_file_total, advance_progress, finish_progress
 
 
 load_dotenv()
@@ -152,25 +165,34 @@ model_import_actions = {
 pk_maps = {}
 next_id_maps = {}
 tables = {}
+compound_fk_index = {}
 
-def load_maps(models=[]):
-    try:
-        # Load from files
-        for modelName in models:
-            with open(maps_load_dir + "/" + modelName + "_pk_map.json", "r") as f:
-                pk_maps[modelName] = json.load(f)
+def load_maps(models=[], warn_missing=True):
+    # Load from files
+    for modelName in models:
+        # models without a pk map (snvs, frequencies) still have a next id
+        try:
             with open(maps_load_dir + "/" + modelName + "_next_id.json", "r") as f:
                 next_id_maps[modelName] = json.load(f)
+        except FileNotFoundError:
+            pass
+        try:
+            with open(maps_load_dir + "/" + modelName + "_pk_map.json", "r") as f:
+                pk_maps[modelName] = json.load(f)
             log_output("loaded map for " + modelName +". number of records: " + str(len(pk_maps[modelName])))
 
-    except FileNotFoundError:
-        pk_maps[modelName] = {}
-        pass
+        except FileNotFoundError as e:
+            if modelName not in pk_maps:
+                pk_maps[modelName] = {}
+            if not warn_missing:
+                continue
+            log_data_issue("could not load map for " + modelName + " (" + str(e.filename) + "), references to it will be missing. "
+                + "rebuild the maps from the database with: python manage.py rebuild_import_maps")
 
 def append_to_map(modelName, key, value):
     if modelName not in pk_maps:
         log_output("")
-        load_maps(models=[modelName])
+        load_maps(models=[modelName], warn_missing=False)
     if key not in pk_maps[modelName]:
         pk_maps[modelName][key] = value
 
@@ -198,6 +220,67 @@ def resolve_PK(referencedModel, name):
     except KeyError:
         return None
 
+def build_compound_fk_index():
+    """sorted (transcript id, variant id) keys -> variants_transcripts ids, built once and shared by every DO_COMPOUND_FK model"""
+    if "keys" in compound_fk_index:
+        return compound_fk_index
+    if "variants_transcripts" not in pk_maps:
+        load_maps(models=["variants_transcripts"])
+    vt_map = pk_maps["variants_transcripts"]
+    log_output("building compound key index from " + str(len(vt_map)) + " variants_transcripts")
+
+    transcript_ids = np.empty(len(vt_map), dtype=np.int64)
+    variant_ids = np.empty(len(vt_map), dtype=np.int64)
+    vt_ids = np.empty(len(vt_map), dtype=np.int64)
+    count = 0
+    for map_key, vt_id in vt_map.items():
+        t_id, v_id = map_key.split("-")
+        if not t_id.isdigit() or not v_id.isdigit():
+            continue
+        transcript_ids[count] = int(t_id)
+        variant_ids[count] = int(v_id)
+        vt_ids[count] = vt_id
+        count += 1
+
+    keys = compound_key(transcript_ids[:count], variant_ids[:count])
+    order = np.argsort(keys)
+    compound_fk_index["keys"] = keys[order]
+    compound_fk_index["ids"] = vt_ids[:count][order]
+    return compound_fk_index
+
+# a (transcript id, variant id) pair is packed into one int64 key, 32 bits each
+COMPOUND_ID_LIMIT = 1 << 32
+
+def compound_key(transcript_ids, variant_ids):
+    for ids in (transcript_ids, variant_ids):
+        # a larger id would spill into the other half of the key, and collide with another pair
+        if len(ids) > 0 and (ids.min() < 0 or ids.max() >= COMPOUND_ID_LIMIT):
+            raise ValueError("compound keys need ids in [0, 2**32), got " + str(ids.min()) + " to " + str(ids.max()))
+    return (transcript_ids << 32) | variant_ids
+
+def resolve_compound_fk(df, name):
+    """resolve the variant and transcript columns of a whole dataframe to a variant_transcript column at once"""
+    index = build_compound_fk_index()
+    v_ids = df["variant"].astype("string").str.upper().map(pk_maps.get("variants", {}))
+    t_ids = df["transcript"].astype("string").str.upper().map(pk_maps.get("transcripts", {}))
+    resolved = (v_ids.notna() & t_ids.notna()).to_numpy()
+
+    keys = compound_key(t_ids[resolved].astype(np.int64).to_numpy(), v_ids[resolved].astype(np.int64).to_numpy())
+    positions = np.searchsorted(index["keys"], keys)
+    found = positions < len(index["keys"])
+    found[found] = index["keys"][positions[found]] == keys[found]
+    resolved[resolved] = found
+
+    missing = df[~resolved]
+    for missing_row in missing.replace(np.nan, None).to_dict("records"):
+        log_data_issue("Missing variant_transcript " + str(missing_row.get("transcript")) + "-" + str(missing_row.get("variant"))
+            + " referenced from " + name)
+        log_data_issue(missing_row)
+
+    df = df[resolved].drop(columns=["variant", "transcript"])
+    df["variant_transcript"] = index["ids"][positions[found]]
+    return df, len(missing)
+
 def get_table(model):
     global tables
     if model in tables:
@@ -237,11 +320,6 @@ def inject(model, data, map_key):
 
 def import_file(file, file_info, action_info):
     name = action_info.get("name")
-    fk_map = action_info.get("fk_map")
-    pk_lookup_col = action_info.get("pk_lookup_col")
-    filters = action_info.get("filters") or {}
-
-    missingRefCount = 0
     table = get_table(name)
     types_dict = {}
     for column in table.columns:
@@ -256,6 +334,22 @@ def import_file(file, file_info, action_info):
             pass
 
     df = readTSV(file, file_info, dtype=types_dict)
+    results = import_dataframe(df, action_info, file_info["total_rows"])
+    # dispose of df to save ram
+    del df
+    return results
+
+def import_dataframe(df, action_info, total_rows, track_progress=True):
+    name = action_info.get("name")
+    fk_map = action_info.get("fk_map")
+    pk_lookup_col = action_info.get("pk_lookup_col")
+    filters = action_info.get("filters") or {}
+
+    missingRefCount = 0
+    table = get_table(name)
+    if "DO_COMPOUND_FK" in fk_map:
+        df, missingRefCount = resolve_compound_fk(df, name)
+        fk_map = {fk_col: fk_model for fk_col, fk_model in fk_map.items() if fk_col != "DO_COMPOUND_FK"}
     df.replace(np.nan, None, inplace=True)
     
     data_list = []
@@ -266,40 +360,29 @@ def import_file(file, file_info, action_info):
 
         skip = False
         for col, filter in filters.items():
-            data[col] = filter(data[col])
+            if col in data:
+                data[col] = filter(data[col])
         for fk_col, fk_model in fk_map.items():
             map_key = None
             resolved_pk = None
-            debug_row = None
-            if fk_col == "DO_COMPOUND_FK":
-
-                debug_row = data.copy()
-                v_id = resolve_PK("variants", data["variant"])
-                t_id = resolve_PK("transcripts", data["transcript"])
-                map_key = "-".join([str(t_id), str(v_id)])
-                del data["variant"]
-                del data["transcript"]
-                resolved_pk = resolve_PK("variants_transcripts", map_key)
-                fk_col = "variant_transcript"
+            if isinstance(data[fk_col], str):
+                map_key = data[fk_col].upper()
+            if map_key == "NA":
+                data[fk_col] = None
             else:
-                if isinstance(data[fk_col], str):
-                    map_key = data[fk_col].upper()
-                if map_key == "NA":
-                    data[fk_col] = None
-                else:
-                    resolved_pk = resolve_PK(fk_model, map_key)
-                    ## resolved PK was not found from maps, so.. if it's a gene, we could dynamically inject
-                    if (resolved_pk == None and fk_col == "gene" and name == "transcripts"):
-                        resolved_pk = inject("genes",{"short_name":map_key}, map_key)
-                    elif (resolved_pk == None and fk_col == "variant" and name in ["sv_consequences", "svs", "snvs", "mts"]):
-                        
-                        if (name == "sv_consequences" or name == "svs"):
-                            var_type = "SV"
-                        elif (name == "snvs"):
-                            var_type = "SNV"
-                        elif (name == "mts"):
-                            var_type = "MT"
-                        resolved_pk = inject("variants",{"variant_id":map_key, "var_type": var_type}, map_key)
+                resolved_pk = resolve_PK(fk_model, map_key)
+                ## resolved PK was not found from maps, so.. if it's a gene, we could dynamically inject
+                if (resolved_pk == None and fk_col == "gene" and name == "transcripts"):
+                    resolved_pk = inject("genes",{"short_name":map_key}, map_key)
+                elif (resolved_pk == None and fk_col == "variant" and name in ["sv_consequences", "svs", "snvs", "mts"]):
+                    
+                    if (name == "sv_consequences" or name == "svs"):
+                        var_type = "SV"
+                    elif (name == "snvs"):
+                        var_type = "SNV"
+                    elif (name == "mts"):
+                        var_type = "MT"
+                    resolved_pk = inject("variants",{"variant_id":map_key, "var_type": var_type}, map_key)
             if map_key is not None and False:
                 log_output(
                     "resolved "
@@ -320,10 +403,7 @@ def import_file(file, file_info, action_info):
                     + " referenced from "
                     + name if name is not None else "None"
                 )
-                if (debug_row is not None):
-                    log_data_issue(debug_row)
-                else:
-                    log_data_issue(data)
+                log_data_issue(data)
                 missingRefCount += 1
                 skip = True
         if skip:
@@ -343,8 +423,9 @@ def import_file(file, file_info, action_info):
         
         data_list.append(data)
 
-    # dispose of df to save ram
-    del df
+    if track_progress:
+        advance_progress(missingRefCount, {"missingRef": missingRefCount})
+
     with engine.connect() as connection:
         successCount = 0
         failCount = 0
@@ -352,7 +433,15 @@ def import_file(file, file_info, action_info):
         successful_chunks = 0
         fail_chunks = 0
 
-        for chunk in chunks(data_list, chunk_size):
+        sizer = get_chunk_sizer(name)
+        position = 0
+        while position < len(data_list):
+            chunk = data_list[position : position + sizer["size"]]
+            position += len(chunk)
+            chunk_start_counts = (successCount, failCount, duplicateCount)
+            chunk_started = time.monotonic()
+            chunk_failed = False
+            chunk_timed_out = False
             try:
                 connection.execute(table.insert(), chunk)
                 #commit
@@ -364,6 +453,8 @@ def import_file(file, file_info, action_info):
                 #                print(e)
                 connection.rollback()
                 fail_chunks += 1
+                chunk_failed = True
+                chunk_timed_out = is_statement_timeout(e)
                 for row in chunk:
                     did_succeed = False
                     try:
@@ -392,6 +483,16 @@ def import_file(file, file_info, action_info):
                     if (not did_succeed):
                         connection.rollback()
 
+            record_chunk(sizer, chunk, time.monotonic() - chunk_started, chunk_failed, chunk_timed_out)
+            throttle_chunk(chunk)
+
+            if track_progress:
+                advance_progress(len(chunk), {
+                    "success": successCount - chunk_start_counts[0],
+                    "fail": failCount - chunk_start_counts[1],
+                    "duplicate": duplicateCount - chunk_start_counts[2],
+                })
+
             if pk_lookup_col is not None:
                 pk_map = {}
                 for data in chunk:
@@ -410,7 +511,7 @@ def import_file(file, file_info, action_info):
                 for key in pk_map:
                     append_to_map(name, key.upper(), pk_map[key])
 
-    next_id_maps[name] += file_info["total_rows"]
+    next_id_maps[name] += total_rows
 
     return {
         "success": successCount,
@@ -421,10 +522,39 @@ def import_file(file, file_info, action_info):
         "fail_chunks": fail_chunks,
     }
 
+def import_vcf(file):
+    """import variants, snvs and both frequency tables from one pass over a vcf"""
+    info_map = load_vcf_info_map()
+    counts = {model: {"success": 0, "fail": 0, "missingRef": 0, "duplicate": 0, "successful_chunks": 0, "fail_chunks": 0} for model in vcf_models}
+    # a resumed import (COPY_MAPS_FROM_JOB) carries on from the ids and variants already imported
+    load_maps(models=vcf_models, warn_missing=False)
+    for modelName in vcf_models:
+        if modelName not in next_id_maps:
+            next_id_maps[modelName] = 1
+    records_read = 0
+    for num_records, dfs, estimated_records in readVCF(file, info_map, chunk_size):
+        # variants go first so the chunk's snvs and frequencies can resolve them from the pk map
+        chunk_counts = {}
+        for modelName in vcf_models:
+            df = dfs[modelName]
+            if len(df) == 0:
+                continue
+            results = import_dataframe(df, model_import_actions[modelName], len(df), track_progress=False)
+            for key in results:
+                counts[modelName][key] += results[key]
+                chunk_counts[key] = chunk_counts.get(key, 0) + results[key]
+        records_read += num_records
+        set_progress_file_total(estimated_records)
+        advance_progress(num_records, chunk_counts)
+        log_output("imported " + str(counts["variants"]["success"]) + " variants so far from " + file.split("/")[-1])
+    set_progress_file_total(records_read)
+    return counts
+
 def cleanup(sig, frame):
     global engine, pk_maps, next_id_maps, tables, metadata, data_issue_logger, output_logger
     log_output("terminating, cleaning up ...")
     log_data_issue("terminating, cleaning up ...")
+    finish_progress("terminated")
     persist_and_unload_maps()
     engine.dispose()
     #garbage collect
@@ -439,64 +569,36 @@ def cleanup(sig, frame):
 
 signal.signal(signal.SIGINT, cleanup)
 
-def start(db_engine):
-
+def plan_import(vcf_files):
+    """work out which files will be imported for each model, and how many rows they hold"""
     arrived_at_start_model = False
     arrived_at_start_file = False
-    global job_dir, maps_load_dir, engine, schema
-    engine = db_engine
-
-    if isinstance(schema,str) and len(schema) > 0:
-        metadata.reflect(bind=engine, schema=schema)
-    else:
-        metadata.reflect(bind=engine)
-    Session = sessionmaker(bind=engine)
-    jobs_dir = os.path.abspath(os.path.join("data/import_script", "jobs"))
-    os.makedirs(jobs_dir, exist_ok=True)
-    os.makedirs(os.path.join(jobs_dir, "1"), exist_ok=True)
-    
-    without_hidden = [f for f in os.listdir(jobs_dir) if not f.startswith('.')]
-    last_job = int(natsorted(without_hidden)[-1])
-    if (os.listdir(os.path.join(jobs_dir, str(last_job))) == []):
-        job_dir = os.path.join(jobs_dir, str(last_job))
-    else:
-        job_dir = os.path.join(jobs_dir, str(last_job + 1))
-    os.makedirs(job_dir, exist_ok=True)
-    os.chmod(job_dir, 0o777)  # Set read and write permissions for the directory
-    setup_loggers(job_dir)
-
-    if copy_maps_from_job is not None and copy_maps_from_job != "":
-        maps_load_dir = os.path.join(jobs_dir, copy_maps_from_job)
-    else:
-        maps_load_dir = job_dir
-    print("using job dir " + maps_load_dir)
-
-    now = datetime.now()
-    counts = {}
-    counts["success"] = 0
-    counts["fail"] = 0
-    counts["missingRef"] = 0
-    counts["duplicate"] = 0
-    counts["successful_chunks"] = 0
-    counts["fail_chunks"] = 0
+    vcf_planned = False
+    plan = []
 
     for modelName, action_info in model_import_actions.items():
-        model_counts = {}
-        model_counts["success"] = 0
-        model_counts["fail"] = 0
-        model_counts["missingRef"] = 0
-        model_counts["duplicate"] = 0
-        model_counts["successful_chunks"] = 0
-        model_counts["fail_chunks"] = 0
         model_directory =os.path.join( rootDir, modelName)
 
-
         if isinstance(start_at_model, str) and modelName != start_at_model and not arrived_at_start_model:
             log_output("Skipping " + modelName +", until "+start_at_model)
             continue
 
         if isinstance(start_at_model, str) and modelName == start_at_model:
             arrived_at_start_model = True
+
+        if len(vcf_files) > 0 and modelName in vcf_models:
+            # a vcf fills all of vcf_models in one pass, so starting at any of them starts at the vcf
+            if not vcf_planned:
+                vcf_planned = True
+                if modelName != vcf_models[0]:
+                    log_output("starting at " + modelName + " re-reads the vcf, which imports " + str(vcf_models) + " together")
+                # an estimate, revised as the files are read
+                files = [(vcf_file, {"total_rows": estimate_vcf_records(vcf_file)}) for vcf_file in vcf_files]
+                plan.append({"model": modelName, "vcf": True, "files": files,
+                    "total_rows": sum(file_info["total_rows"] for vcf_file, file_info in files)})
+            else:
+                log_output("Skipping " + modelName + ", already imported from vcf")
+            continue
             
         large_model_file_tsv = os.path.join(rootDir, modelName + ".tsv")
         large_model_file_tsv_exists = os.path.isfile(large_model_file_tsv)
@@ -508,17 +610,6 @@ def start(db_engine):
                 log_output("Skipping " + modelName + " (expected dir: " + model_directory + ")")
                 continue
 
-        referenced_models = action_info.get("fk_map").values()
-        if "DO_COMPOUND_FK" in action_info.get("fk_map"):
-            referenced_models = ["variants_transcripts", "variants", "transcripts"]
-        load_maps(models=referenced_models)
-        modelNow = datetime.now()
-        
-        # if modelName not in pk_maps:
-        #     pk_maps[modelName] = {}
-        if modelName not in next_id_maps:
-            next_id_maps[modelName] = 1
-
         if large_model_file_tsv_exists:
             sorted_files = [modelName + ".tsv"]
         else:
@@ -526,7 +617,7 @@ def start(db_engine):
                 [f for f in os.listdir(model_directory) if not f.startswith('.')],
             )
 
-
+        files = []
         for file in sorted_files:
             if file.endswith(".tsv"):
 
@@ -540,33 +631,84 @@ def start(db_engine):
                     targetFile = large_model_file_tsv
                 else:
                     targetFile = model_directory + "/" + file
-                file_info = inspectTSV(targetFile)
-                log_output(
-                    "\nimporting "
-                    + modelName
-                    + " ("
-                    + targetFile.split("/")[-1]
-                    + "). Expecting "
-                    + str(file_info["total_rows"])
-                    + " rows..."
-                )
-                # log_output(targetFile)
-                if (file_info["total_rows"] == 0):
-                    log_output("Skipping empty file")
-                    continue
-                results = import_file(
-                    targetFile,
-                    file_info,
-                    action_info,
-                )
-                if results["success"] == 0:
-                    log_output("No rows were imported.")
-                    
-                for key in ["success", "fail", "missingRef", "duplicate", "successful_chunks", "fail_chunks"]:
-                    model_counts[key] += results[key]
-                    counts[key] += results[key]
+                files.append((targetFile, inspectTSV(targetFile)))
+
+        plan.append({"model": modelName, "files": files,
+            "total_rows": sum(file_info["total_rows"] for targetFile, file_info in files)})
 
-                report_counts(results)
+    log_output("planned import of " + str(sum(step["total_rows"] for step in plan)) + " rows across " + str(len(plan)) + " models")
+    return plan
+
+def import_plan(plan, counts):
+    """import each step of plan_import's plan, adding to counts, then rebuild everything derived from the tables"""
+    for step in plan:
+        modelName = step["model"]
+        action_info = model_import_actions[modelName]
+        model_counts = {}
+        model_counts["success"] = 0
+        model_counts["fail"] = 0
+        model_counts["missingRef"] = 0
+        model_counts["duplicate"] = 0
+        model_counts["successful_chunks"] = 0
+        model_counts["fail_chunks"] = 0
+
+        if step.get("vcf"):
+            modelNow = datetime.now()
+            for vcf_file, file_info in step["files"]:
+                log_output("\nimporting " + str(vcf_models) + " from vcf (" + vcf_file.split("/")[-1] + "). Expecting about "
+                    + str(file_info["total_rows"]) + " records...")
+                set_progress_file(modelName, vcf_file.split("/")[-1], file_info["total_rows"])
+                vcf_counts = import_vcf(vcf_file)
+                for vcf_model, results in vcf_counts.items():
+                    log_output(vcf_model + ":")
+                    report_counts(results)
+                    for key in results:
+                        counts[key] += results[key]
+            log_output("\nFinished importing vcf files. Took this much time: " + str(datetime.now() - modelNow))
+            for vcf_model in vcf_models:
+                report_chunk_sizes(vcf_model)
+            persist_and_unload_maps()
+            continue
+
+        referenced_models = action_info.get("fk_map").values()
+        if "DO_COMPOUND_FK" in action_info.get("fk_map"):
+            referenced_models = ["variants", "transcripts"]
+        load_maps(models=referenced_models)
+        modelNow = datetime.now()
+        
+        # if modelName not in pk_maps:
+        #     pk_maps[modelName] = {}
+        if modelName not in next_id_maps:
+            next_id_maps[modelName] = 1
+
+        for targetFile, file_info in step["files"]:
+            log_output(
+                "\nimporting "
+                + modelName
+                + " ("
+                + targetFile.split("/")[-1]
+                + "). Expecting "
+                + str(file_info["total_rows"])
+                + " rows..."
+            )
+            # log_output(targetFile)
+            if (file_info["total_rows"] == 0):
+                log_output("Skipping empty file")
+                continue
+            set_progress_file(modelName, targetFile.split("/")[-1], file_info["total_rows"])
+            results = import_file(
+                targetFile,
+                file_info,
+                action_info,
+            )
+            if results["success"] == 0:
+                log_output("No rows were imported.")
+                
+            for key in ["success", "fail", "missingRef", "duplicate", "successful_chunks", "fail_chunks"]:
+                model_counts[key] += results[key]
+                counts[key] += results[key]
+
+            report_counts(results)
 
         log_output(
             "\nFinished importing "
@@ -575,12 +717,99 @@ def start(db_engine):
             + str(datetime.now() - modelNow)
         )
         report_counts(model_counts)
+        report_chunk_sizes(modelName)
         this_model_index = list(model_import_actions.keys()).index(modelName)
         if this_model_index + 1 < len(model_import_actions.keys()):
             leftover_models = list(model_import_actions.keys())[this_model_index+1:]
             log_output("\nmodels left still: " + str(leftover_models) + "\n")
         
         persist_and_unload_maps()
+    try:
+        build_search_index(engine, log=log_output)
+    except ProgrammingError as e:
+        log_output("could not rebuild the search index, run the migrations: " + str(e))
+    try:
+        compute_worst_consequences(engine, log=log_output)
+    except ProgrammingError as e:
+        log_output("could not compute worst consequences, run the migrations: " + str(e))
+    try:
+        build_annotation_documents(engine, log=log_output)
+    except ProgrammingError as e:
+        log_output("could not build the annotation documents, run the migrations: " + str(e))
+    try:
+        refresh_summaries(engine, log=log_output)
+    except ProgrammingError as e:
+        log_output("could not refresh the summary tables, run the migrations: " + str(e))
+    try:
+        cluster_after_import_tables(engine, throttled=throttle["enabled"], log=log_output)
+    except ProgrammingError as e:
+        log_output("could not cluster tables, run the migrations: " + str(e))
+    # lets the api drop responses cached from the previous data
+    try:
+        generation = DatasetGeneration.bump()
+        log_output("dataset generation is now " + str(generation))
+    except DatabaseError as e:
+        log_output("could not bump the dataset generation, run the migrations: " + str(e))
+    # after the bump: the filter is stamped with the new generation, and the api ignores it until then
+    try:
+        build_variant_filter(engine, log=log_output)
+    except (ProgrammingError, OSError) as e:
+        log_output("could not build the variant filter: " + str(e))
+
+def start(db_engine):
+
+    global job_dir, maps_load_dir, engine, schema
+    engine = db_engine
+
+    if isinstance(schema,str) and len(schema) > 0:
+        metadata.reflect(bind=engine, schema=schema)
+    else:
+        metadata.reflect(bind=engine)
+    Session = sessionmaker(bind=engine)
+    jobs_dir = get_jobs_dir()
+    os.makedirs(jobs_dir, exist_ok=True)
+    os.makedirs(os.path.join(jobs_dir, "1"), exist_ok=True)
+    
+    without_hidden = [f for f in os.listdir(jobs_dir) if not f.startswith('.')]
+    last_job = int(natsorted(without_hidden)[-1])
+    if (os.listdir(os.path.join(jobs_dir, str(last_job))) == []):
+        job_dir = os.path.join(jobs_dir, str(last_job))
+    else:
+        job_dir = os.path.join(jobs_dir, str(last_job + 1))
+    os.makedirs(job_dir, exist_ok=True)
+    os.chmod(job_dir, 0o777)  # Set read and write permissions for the directory
+    setup_loggers(job_dir)
+
+    if copy_maps_from_job is not None and copy_maps_from_job != "":
+        maps_load_dir = os.path.join(jobs_dir, copy_maps_from_job)
+    else:
+        maps_load_dir = job_dir
+    print("using job dir " + maps_load_dir)
+
+    now = datetime.now()
+    counts = {}
+    counts["success"] = 0
+    counts["fail"] = 0
+    counts["missingRef"] = 0
+    counts["duplicate"] = 0
+    counts["successful_chunks"] = 0
+    counts["fail_chunks"] = 0
+
+    vcf_files = find_vcf_files(rootDir)
+    if len(vcf_files) > 0:
+        log_output("found vcf files, " + str(vcf_models) + " will be read from them instead of tsvs: " + str(vcf_files))
+
+    plan = plan_import(vcf_files)
+    start_progress(engine, os.path.basename(job_dir), sum(step["total_rows"] for step in plan))
+
+    try:
+        import_plan(plan, counts)
+    except Exception as e:
+        # anything but a SIGINT (cleanup), so the progress doesn't stay "running" for an import that died
+        log_output("import failed: " + repr(e))
+        finish_progress("failed")
+        raise
+    finish_progress("finished")
     log_output("finished importing IBVL. Time Taken: " + str(datetime.now() - now))
     report_counts(counts)
     cleanup(None, None)
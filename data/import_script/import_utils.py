@@ -11,6 +11,12 @@ load_dotenv()
 chunk_size = int(os.environ.get("CHUNK_SIZE"))
 verbose = os.environ.get("VERBOSE") == "true" or os.environ.get("VERBOSE") == "True"
 
+# limits for the write batch size the importer tunes at runtime
+adaptive_chunk_size = os.environ.get("ADAPTIVE_CHUNK_SIZE") not in ["false", "False"]
+chunk_size_min = int(os.environ.get("CHUNK_SIZE_MIN") or min(100, chunk_size))
+chunk_size_max = int(os.environ.get("CHUNK_SIZE_MAX") or chunk_size * 10)
+chunk_bytes_max = int(os.environ.get("CHUNK_BYTES_MAX") or 16 * 1024 * 1024)
+
 def inspectTSV(file):
     total_rows = 0
     separator = "\t"
@@ -100,4 +106,86 @@ def report_counts(counts):
 def chunks(l, n):
     """Yield successive n-sized chunks from list l."""
     for i in range(0, len(l), n):
-        yield l[i : i + n]
\ No newline at end of file
+        yield l[i : i + n]
+
+chunk_sizers = {}
+
+def get_chunk_sizer(name):
+    """write batch size state for a model, kept across its files"""
+    if name not in chunk_sizers:
+        chunk_sizers[name] = {
+            "name": name,
+            "size": chunk_size,
+            "direction": 1,
+            "last_throughput": None,
+            "recent_failures": [],
+            "sizes_used": set(),
+        }
+    return chunk_sizers[name]
+
+def estimate_bytes(rows, sample_size=20):
+    sample = rows[:sample_size]
+    if len(sample) == 0:
+        return 0
+    sample_bytes = sum(len(str(value)) for row in sample for value in row.values())
+    return int(sample_bytes / len(sample) * len(rows))
+
+def is_statement_timeout(e):
+    msg = str(e).lower()
+    return "statement timeout" in msg or "canceling statement" in msg or "querycanceled" in msg
+
+def record_chunk(sizer, rows, seconds, failed, timed_out=False):
+    """tune the next batch size from how this batch went: hill-climb on rows/sec, back off on failures and timeouts"""
+    sizer["sizes_used"].add(len(rows))
+    if not adaptive_chunk_size:
+        return
+    old_size = sizer["size"]
+    sizer["recent_failures"] = (sizer["recent_failures"] + [failed])[-10:]
+    failure_rate = sum(sizer["recent_failures"]) / len(sizer["recent_failures"])
+
+    if timed_out:
+        new_size = old_size // 4
+        reason = "statement timeout"
+    elif failed and failure_rate > 0.2:
+        # a failed batch is retried row by row, so smaller batches waste less work on dirty files
+        new_size = old_size // 2
+        reason = "failure rate " + str(round(failure_rate * 100)) + "%"
+    elif failed or seconds <= 0 or len(rows) < old_size:
+        return
+    else:
+        throughput = len(rows) / seconds
+        if sizer["last_throughput"] is not None and throughput < 0.9 * sizer["last_throughput"]:
+            sizer["direction"] = -sizer["direction"]
+        sizer["last_throughput"] = throughput
+        if sizer["direction"] > 0:
+            new_size = int(old_size * 1.5)
+        else:
+            new_size = int(old_size / 1.5)
+        reason = str(round(throughput)) + " rows/sec"
+
+    row_bytes = estimate_bytes(rows) / max(len(rows), 1)
+    if row_bytes > 0:
+        new_size = min(new_size, int(chunk_bytes_max / row_bytes))
+    new_size = max(chunk_size_min, min(chunk_size_max, new_size))
+    if new_size != old_size:
+        sizer["size"] = new_size
+        if timed_out or failed:
+            # throughput measured at the old size no longer applies
+            sizer["last_throughput"] = None
+            sizer["direction"] = 1
+        log_output("chunk size for " + sizer["name"] + ": " + str(old_size) + " -> " + str(new_size) + " (" + reason + ")")
+
+def report_chunk_sizes(name):
+    if name not in chunk_sizers or len(chunk_sizers[name]["sizes_used"]) == 0:
+        return
+    sizes_used = chunk_sizers[name]["sizes_used"]
+    log_output(
+        "chunk sizes used for "
+        + name
+        + ": "
+        + str(min(sizes_used))
+        + " to "
+        + str(max(sizes_used))
+        + ", next chunk size: "
+        + str(chunk_sizers[name]["size"])
+    )
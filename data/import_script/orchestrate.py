@@ -1,4 +1,5 @@
 from .do_import import start
+from .throttle import setup_throttle
 from dotenv import load_dotenv
 import os
 from sqlalchemy import create_engine
@@ -8,7 +9,11 @@ from sqlalchemy import (
     event
 )
 
-def setup_and_run():
+def setup_and_run(**throttle_options):
+    """
+    throttle_options (max_rows_per_sec, max_bytes_per_sec, max_replication_lag, canary_query, max_canary_ms,
+    check_interval) turn on import throttling; each falls back to its IMPORT_* env variable
+    """
         
     load_dotenv()
 
@@ -30,5 +35,6 @@ def setup_and_run():
 
     print("connecting...")
     engine = create_engine(dbConnectionString, echo=False, pool_pre_ping=True, pool_recycle=3600)
+    setup_throttle(engine, **throttle_options)
 
     start(engine)   
@@ -0,0 +1,115 @@
+import time
+from datetime import datetime, timezone
+from sqlalchemy import MetaData, Table
+
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# how often (seconds) progress is written to the import_progress table
+progress_interval = float(os.environ.get("PROGRESS_INTERVAL") or 5)
+
+progress = {}
+progress_table = None
+engine = None
+
+def start_progress(db_engine, job, rows_total):
+    global progress_table, engine
+    engine = db_engine
+    try:
+        progress_table = Table("import_progress", MetaData(), autoload_with=engine)
+    except Exception as e:
+        # the web app's migrations have not created the table, so progress is only logged
+        print("import_progress table not available, progress will not be published: " + str(e))
+        progress_table = None
+    now = datetime.now(timezone.utc)
+    progress.clear()
+    progress.update({
+        "job": job,
+        "status": "running",
+        "started_at": now,
+        "updated_at": now,
+        "finished_at": None,
+        "current_model": "",
+        "current_file": "",
+        "file_rows_done": 0,
+        "file_rows_total": 0,
+        "rows_done": 0,
+        "rows_total": rows_total,
+        "rows_per_second": 0,
+        "eta_seconds": None,
+        "success": 0,
+        "fail": 0,
+        "missing_ref": 0,
+        "duplicate": 0,
+    })
+    progress["_started"] = time.monotonic()
+    progress["_published"] = 0
+    if progress_table is not None:
+        with engine.connect() as connection:
+            row = {key: value for key, value in progress.items() if not key.startswith("_")}
+            progress["_id"] = connection.execute(progress_table.insert().returning(progress_table.c.id), row).scalar()
+            connection.commit()
+
+def set_progress_file(model, file, file_rows_total):
+    if len(progress) == 0:
+        return
+    progress["current_model"] = model
+    progress["current_file"] = file
+    progress["file_rows_done"] = 0
+    progress["file_rows_total"] = file_rows_total
+    publish_progress(force=True)
+
+def set_progress_file_total(file_rows_total):
+    """revise the current file's expected rows (e.g. a vcf's estimate as it's read), and the job's total with it"""
+    if len(progress) == 0:
+        return
+    progress["rows_total"] += file_rows_total - progress["file_rows_total"]
+    progress["file_rows_total"] = file_rows_total
+
+def advance_progress(rows, counts={}):
+    """count rows read from the current file, with the success/fail counts they produced"""
+    if len(progress) == 0:
+        return
+    progress["file_rows_done"] += rows
+    progress["rows_done"] += rows
+    progress["success"] += counts.get("success", 0)
+    progress["fail"] += counts.get("fail", 0)
+    progress["missing_ref"] += counts.get("missingRef", 0)
+    progress["duplicate"] += counts.get("duplicate", 0)
+    publish_progress()
+
+def publish_progress(force=False):
+    now = time.monotonic()
+    if not force and now - progress["_published"] < progress_interval:
+        return
+    progress["_published"] = now
+
+    elapsed = now - progress["_started"]
+    if elapsed > 0:
+        progress["rows_per_second"] = progress["rows_done"] / elapsed
+    if progress["rows_per_second"] > 0 and progress["rows_total"] >= progress["rows_done"]:
+        progress["eta_seconds"] = (progress["rows_total"] - progress["rows_done"]) / progress["rows_per_second"]
+    else:
+        progress["eta_seconds"] = None
+    progress["updated_at"] = datetime.now(timezone.utc)
+
+    if progress_table is None or "_id" not in progress:
+        return
+    try:
+        with engine.connect() as connection:
+            row = {key: value for key, value in progress.items() if not key.startswith("_")}
+            connection.execute(progress_table.update().where(progress_table.c.id == progress["_id"]), row)
+            connection.commit()
+    except Exception as e:
+        # never let progress reporting break the import itself
+        print("could not publish import progress: " + str(e))
+
+def finish_progress(status):
+    if len(progress) == 0 or progress["status"] != "running":
+        return
+    progress["status"] = status
+    progress["finished_at"] = datetime.now(timezone.utc)
+    progress["current_file"] = ""
+    publish_progress(force=True)
@@ -0,0 +1,77 @@
+import json
+import os
+from sqlalchemy import MetaData, select, func
+
+from dotenv import load_dotenv
+from django.conf import settings
+
+load_dotenv()
+
+# natural key column(s) of each model that the importer keeps a pk map for,
+# mirroring pk_lookup_col in do_import.model_import_actions
+map_key_columns = {
+    "genes": "short_name",
+    "transcripts": "transcript_id",
+    "variants": "variant_id",
+    "variants_transcripts": ["transcript", "variant"],
+}
+
+# every model the importer tracks a next id for
+id_models = [
+    "genes",
+    "transcripts",
+    "variants",
+    "variants_transcripts",
+    "variants_annotations",
+    "severities",
+    "variants_consequences",
+    "snvs",
+    "genomic_variome_frequencies",
+    "genomic_gnomad_frequencies",
+]
+
+def get_jobs_dir():
+    return os.path.join(settings.BASE_DIR, "data/import_script", "jobs")
+
+def stream_pk_map(engine, table, key_col, fetch_size):
+    """build natural key -> id for a table, streamed through a server-side cursor"""
+    pk_map = {}
+    if isinstance(key_col, list):
+        key_columns = [table.columns[col] for col in key_col]
+    else:
+        key_columns = [table.columns[key_col]]
+    query = select(table.columns["id"], *key_columns)
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=fetch_size).execute(query)
+        for row in result:
+            # keys are built exactly as import_file records them: joined by "-" and upper case
+            map_key = "-".join([str(value) for value in row[1:]]).upper()
+            if map_key not in pk_map:
+                pk_map[map_key] = row[0]
+    return pk_map
+
+def next_id(engine, table):
+    with engine.connect() as connection:
+        max_id = connection.execute(select(func.max(table.columns["id"]))).scalar()
+    return 1 if max_id is None else max_id + 1
+
+def rebuild_maps(engine, job_dir, models=None, fetch_size=100000):
+    """write <model>_pk_map.json and <model>_next_id.json for each model into job_dir"""
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    if models is None or len(models) == 0:
+        models = id_models
+    os.makedirs(job_dir, exist_ok=True)
+
+    for modelName in models:
+        if modelName not in metadata.tables:
+            print("no table for " + modelName + ", skipping")
+            continue
+        table = metadata.tables[modelName]
+        if modelName in map_key_columns:
+            pk_map = stream_pk_map(engine, table, map_key_columns[modelName], fetch_size)
+            with open(os.path.join(job_dir, modelName + "_pk_map.json"), "w") as f:
+                json.dump(pk_map, f)
+            print("rebuilt pk map for " + modelName + ". number of records: " + str(len(pk_map)))
+        with open(os.path.join(job_dir, modelName + "_next_id.json"), "w") as f:
+            json.dump(next_id(engine, table), f)
@@ -0,0 +1,76 @@
+from sqlalchemy import text
+
+# each source selects (term, variant) pairs for one kind of identifier.
+# hgvs strings are also indexed without their "transcript:" prefix, since that is how they're usually pasted
+search_sources = {
+    "gene": """
+        SELECT g.short_name AS term, vt.variant AS variant
+        FROM genes g
+        LEFT JOIN transcripts t ON t.gene = g.id
+        LEFT JOIN variants_transcripts vt ON vt.transcript = t.id
+    """,
+    "rsid": """
+        SELECT dbsnp_id AS term, variant FROM snvs WHERE dbsnp_id <> ''
+    """,
+    "hgvsc": """
+        SELECT hgvsc AS term, variant FROM variants_transcripts WHERE hgvsc <> ''
+        UNION ALL
+        SELECT split_part(hgvsc, ':', 2) AS term, variant FROM variants_transcripts WHERE hgvsc LIKE '%:%'
+    """,
+    "hgvsp": """
+        SELECT a.hgvsp AS term, vt.variant AS variant
+        FROM variants_annotations a JOIN variants_transcripts vt ON vt.id = a.variant_transcript
+        WHERE a.hgvsp <> ''
+        UNION ALL
+        SELECT split_part(a.hgvsp, ':', 2) AS term, vt.variant AS variant
+        FROM variants_annotations a JOIN variants_transcripts vt ON vt.id = a.variant_transcript
+        WHERE a.hgvsp LIKE '%:%'
+    """,
+}
+
+def build_search_index(engine, log=print):
+    """
+    bring search_terms and search_terms_variants in line with the imported tables, in one transaction.
+    rows are upserted and stale ones deleted rather than the tables truncated and refilled: TRUNCATE's
+    ACCESS EXCLUSIVE lock would block /api/search until the rebuild commits, this only locks the rows it changes
+    """
+    with engine.begin() as connection:
+        for term_type, source in search_sources.items():
+            # the source's (key, term, variant) rows, read once
+            connection.execute(text(
+                "CREATE TEMP TABLE search_source ON COMMIT DROP AS "
+                + "SELECT UPPER(s.term) AS key, s.term, s.variant FROM (" + source + ") s WHERE s.term IS NOT NULL"
+            ))
+            connection.execute(text("CREATE INDEX ON search_source (key, variant)"))
+            connection.execute(text("ANALYZE search_source"))
+            params = {"term_type": term_type}
+            connection.execute(text(
+                "INSERT INTO search_terms (term_type, key, term, variant_count) "
+                + "SELECT :term_type, key, MIN(term), COUNT(DISTINCT variant) FROM search_source GROUP BY key "
+                + "ON CONFLICT (term_type, key) DO UPDATE SET term = EXCLUDED.term, variant_count = EXCLUDED.variant_count "
+                + "WHERE (search_terms.term, search_terms.variant_count) IS DISTINCT FROM (EXCLUDED.term, EXCLUDED.variant_count)"
+            ), params)
+            connection.execute(text(
+                "DELETE FROM search_terms_variants l USING search_terms t "
+                + "WHERE l.searchterm_id = t.id AND t.term_type = :term_type "
+                + "AND NOT EXISTS (SELECT 1 FROM search_source s WHERE s.key = t.key AND s.variant = l.variant_id)"
+            ), params)
+            connection.execute(text(
+                "DELETE FROM search_terms t WHERE t.term_type = :term_type "
+                + "AND NOT EXISTS (SELECT 1 FROM search_source s WHERE s.key = t.key)"
+            ), params)
+            connection.execute(text(
+                "INSERT INTO search_terms_variants (searchterm_id, variant_id) "
+                + "SELECT DISTINCT t.id, s.variant FROM search_source s "
+                + "JOIN search_terms t ON t.term_type = :term_type AND t.key = s.key "
+                + "WHERE s.variant IS NOT NULL "
+                + "ON CONFLICT (searchterm_id, variant_id) DO NOTHING"
+            ), params)
+            terms, links = connection.execute(text(
+                "SELECT COUNT(DISTINCT t.id), COUNT(l.id) FROM search_terms t "
+                + "LEFT JOIN search_terms_variants l ON l.searchterm_id = t.id WHERE t.term_type = :term_type"
+            ), params).one()
+            connection.execute(text("DROP TABLE search_source"))
+            log("indexed " + str(terms) + " " + term_type + " search terms, referring to variants " + str(links) + " times")
+        connection.execute(text("ANALYZE search_terms"))
+        connection.execute(text("ANALYZE search_terms_variants"))
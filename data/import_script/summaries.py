@@ -0,0 +1,13 @@
+from sqlalchemy import text
+
+# materialized views derived from the imported tables, refreshed in this order when an import finishes
+summary_views = [
+    "gene_summaries",
+]
+
+def refresh_summaries(engine, log=print):
+    for view in summary_views:
+        # CONCURRENTLY keeps the old rows readable by the api while the new ones are computed
+        with engine.begin() as connection:
+            connection.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY " + view))
+        log("refreshed " + view)
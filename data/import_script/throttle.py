@@ -0,0 +1,114 @@
+import time
+from sqlalchemy import text
+
+from dotenv import load_dotenv
+import os
+
+from .import_utils import log_output, estimate_bytes
+
+load_dotenv()
+
+throttle = {
+    "enabled": False,
+}
+
+def env_float(name):
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return None
+    return float(value)
+
+def setup_throttle(db_engine, max_rows_per_sec=None, max_bytes_per_sec=None, max_replication_lag=None,
+        canary_query=None, max_canary_ms=None, check_interval=None):
+    """configure import throttling. anything not passed falls back to its IMPORT_* environment variable"""
+    throttle.clear()
+    throttle.update({
+        "engine": db_engine,
+        "max_rows_per_sec": max_rows_per_sec if max_rows_per_sec is not None else env_float("IMPORT_MAX_ROWS_PER_SEC"),
+        "max_bytes_per_sec": max_bytes_per_sec if max_bytes_per_sec is not None else env_float("IMPORT_MAX_BYTES_PER_SEC"),
+        "max_replication_lag": max_replication_lag if max_replication_lag is not None else env_float("IMPORT_MAX_REPLICATION_LAG"),
+        "canary_query": canary_query or os.environ.get("IMPORT_CANARY_QUERY") or "SELECT id FROM variants ORDER BY id DESC LIMIT 1",
+        "max_canary_ms": max_canary_ms if max_canary_ms is not None else env_float("IMPORT_MAX_CANARY_MS"),
+        "check_interval": check_interval or env_float("IMPORT_THROTTLE_CHECK_INTERVAL") or 5,
+        # fraction of the ceilings currently allowed, lowered while the database is under pressure
+        "rate_factor": 1.0,
+        "window_started": time.monotonic(),
+        "window_rows": 0,
+        "window_bytes": 0,
+        "last_check": 0,
+    })
+    throttle["enabled"] = any(throttle[key] is not None for key in ["max_rows_per_sec", "max_bytes_per_sec", "max_replication_lag", "max_canary_ms"])
+    if throttle["enabled"]:
+        log_output("import throttling enabled: "
+            + str({key: throttle[key] for key in ["max_rows_per_sec", "max_bytes_per_sec", "max_replication_lag", "max_canary_ms"]}))
+
+def replication_lag():
+    """seconds the slowest streaming replica is behind the primary, 0 if there are none"""
+    with throttle["engine"].connect() as connection:
+        lag = connection.execute(text(
+            "SELECT COALESCE(EXTRACT(EPOCH FROM MAX(replay_lag)), 0) FROM pg_stat_replication"
+        )).scalar()
+    return float(lag or 0)
+
+def canary_ms():
+    started = time.monotonic()
+    with throttle["engine"].connect() as connection:
+        connection.execute(text(throttle["canary_query"])).fetchall()
+    return (time.monotonic() - started) * 1000
+
+def database_under_pressure():
+    reasons = []
+    try:
+        if throttle["max_replication_lag"] is not None:
+            lag = replication_lag()
+            if lag > throttle["max_replication_lag"]:
+                reasons.append("replication lag " + str(round(lag, 1)) + "s")
+        if throttle["max_canary_ms"] is not None:
+            ms = canary_ms()
+            if ms > throttle["max_canary_ms"]:
+                reasons.append("canary query " + str(round(ms)) + "ms")
+    except Exception as e:
+        # a failing health check should not stop the import
+        log_output("throttle health check failed: " + str(e))
+    return reasons
+
+def check_health():
+    reasons = database_under_pressure()
+    if len(reasons) > 0:
+        throttle["rate_factor"] = max(throttle["rate_factor"] / 2, 0.01)
+        log_output("throttling import to " + str(round(throttle["rate_factor"] * 100)) + "% (" + ", ".join(reasons) + ")")
+        if throttle["max_rows_per_sec"] is None and throttle["max_bytes_per_sec"] is None:
+            # no ceiling to scale down, so pause and let the database catch up
+            time.sleep(throttle["check_interval"] * (1 - throttle["rate_factor"]))
+    elif throttle["rate_factor"] < 1.0:
+        throttle["rate_factor"] = min(throttle["rate_factor"] + 0.1, 1.0)
+        log_output("easing import throttle to " + str(round(throttle["rate_factor"] * 100)) + "%")
+
+def throttle_chunk(rows):
+    """called after each written batch; sleeps long enough to keep the import under its ceilings"""
+    if not throttle["enabled"]:
+        return
+    throttle["window_rows"] += len(rows)
+    if throttle["max_bytes_per_sec"] is not None:
+        throttle["window_bytes"] += estimate_bytes(rows)
+
+    now = time.monotonic()
+    if now - throttle["last_check"] >= throttle["check_interval"]:
+        throttle["last_check"] = now
+        check_health()
+
+    # time the rows written so far in this window should have taken at the allowed rate
+    required = 0
+    if throttle["max_rows_per_sec"] is not None:
+        required = max(required, throttle["window_rows"] / (throttle["max_rows_per_sec"] * throttle["rate_factor"]))
+    if throttle["max_bytes_per_sec"] is not None:
+        required = max(required, throttle["window_bytes"] / (throttle["max_bytes_per_sec"] * throttle["rate_factor"]))
+    elapsed = time.monotonic() - throttle["window_started"]
+    if required > elapsed:
+        time.sleep(required - elapsed)
+
+    # start a new window now and then so an earlier slow stretch doesn't allow a burst later
+    if time.monotonic() - throttle["window_started"] > throttle["check_interval"] * 6:
+        throttle["window_started"] = time.monotonic()
+        throttle["window_rows"] = 0
+        throttle["window_bytes"] = 0
@@ -0,0 +1,21 @@
+from django.conf import settings
+from sqlalchemy import text
+
+from ibvl.variant_bloom import write_filter
+
+# rows per round trip while streaming the variant ids
+FILTER_FETCH_SIZE = 100000
+
+def build_variant_filter(engine, log=print):
+    """write the variant_id bloom filter the api reads (ibvl/variant_bloom.py), stamped with the current dataset generation"""
+    if settings.VARIANT_FILTER_PATH is None:
+        return
+    with engine.connect() as connection:
+        generation = connection.execute(text("SELECT generation FROM dataset_generation ORDER BY id LIMIT 1")).scalar() or 0
+        count = connection.execute(text("SELECT count(*) FROM variants")).scalar()
+        result = connection.execution_options(stream_results=True, yield_per=FILTER_FETCH_SIZE).execute(text("SELECT variant_id FROM variants"))
+        chunks = ([row[0] for row in partition] for partition in result.partitions())
+        num_bits, num_hashes = write_filter(
+            settings.VARIANT_FILTER_PATH, chunks, count, generation, settings.VARIANT_FILTER_FALSE_POSITIVE_RATE
+        )
+    log("built the variant filter for " + str(count) + " variants (" + str(num_bits // 8) + " bytes, " + str(num_hashes) + " hashes)")
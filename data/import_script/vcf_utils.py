@@ -0,0 +1,245 @@
+import gzip
+import io
+import json
+import pandas as pd
+
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# models that can be filled straight from a VCF, in the order they must be imported
+vcf_models = ["variants", "snvs", "genomic_variome_frequencies", "genomic_gnomad_frequencies"]
+
+# column -> source for each model. Sources in capitals without a prefix are the fixed
+# VCF columns (CHROM, POS, ID, REF, ALT, QUAL, FILTER), "INFO:<key>" reads an INFO field.
+# Override with a json file of the same shape via VCF_INFO_MAP.
+default_vcf_info_map = {
+    "variants": {
+        "filter": "FILTER",
+    },
+    "snvs": {
+        "type": "INFO:VARIANT_CLASS",
+        "cadd_score": "INFO:CADD_PHRED",
+        "cadd_intr": "INFO:CADD_INTR",
+        "dbsnp_id": "ID",
+        "clinvar_vcv": "INFO:CLINVAR_VCV",
+        "splice_ai": "INFO:SpliceAI_max",
+    },
+    "genomic_variome_frequencies": {
+        "af_tot": "INFO:AF",
+        "af_xx": "INFO:AF_XX",
+        "af_xy": "INFO:AF_XY",
+        "ac_tot": "INFO:AC",
+        "ac_xx": "INFO:AC_XX",
+        "ac_xy": "INFO:AC_XY",
+        "an_tot": "INFO:AN",
+        "an_xx": "INFO:AN_XX",
+        "an_xy": "INFO:AN_XY",
+        "hom_tot": "INFO:nhomalt",
+        "hom_xx": "INFO:nhomalt_XX",
+        "hom_xy": "INFO:nhomalt_XY",
+        "quality": "QUAL",
+    },
+    "genomic_gnomad_frequencies": {
+        "af_tot": "INFO:gnomad_AF",
+        "af_popmax": "INFO:gnomad_AF_popmax",
+        "ac_tot": "INFO:gnomad_AC",
+        "an_tot": "INFO:gnomad_AN",
+        "hom_tot": "INFO:gnomad_nhomalt",
+    },
+}
+
+def load_vcf_info_map():
+    info_map_file = os.environ.get("VCF_INFO_MAP")
+    if info_map_file is None or info_map_file == "":
+        return default_vcf_info_map
+    with open(info_map_file, "r") as f:
+        return json.load(f)
+
+def find_vcf_files(rootDir):
+    vcf_dir = os.path.join(rootDir, "vcf")
+    if not os.path.isdir(vcf_dir):
+        return []
+    return sorted([
+        os.path.join(vcf_dir, f) for f in os.listdir(vcf_dir)
+        if not f.startswith('.') and (f.endswith(".vcf") or f.endswith(".vcf.gz") or f.endswith(".vcf.bgz"))
+    ])
+
+def open_vcf(file):
+    """(text stream of the vcf, the raw file under it). raw.tell() is how far into the file on disk reading has got"""
+    raw = open(file, "rb")
+    # bgzip output is a series of gzip members, which gzip reads as one stream
+    if file.endswith(".gz") or file.endswith(".bgz"):
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=raw)), raw
+    return io.TextIOWrapper(raw), raw
+
+def parse_info(info):
+    values = {}
+    if info == "." or info == "":
+        return values
+    for field in info.split(";"):
+        if "=" in field:
+            key, value = field.split("=", 1)
+            values[key] = value
+        else:
+            # flag fields have no value
+            values[field] = True
+    return values
+
+def coerce_value(value):
+    if value is None or value is True or value == "." or value == "":
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    if number.is_integer() and "." not in value and "e" not in value.lower():
+        return int(value)
+    return number
+
+def pick_allele_value(value, alt_index, num_alts):
+    # Number=A fields carry one comma separated value per alt allele
+    if isinstance(value, str) and "," in value:
+        parts = value.split(",")
+        if len(parts) == num_alts:
+            return parts[alt_index]
+    return value
+
+def clinvar_accession(value):
+    # snvs.clinvar_vcv is numeric: "VCV000012345.3" (or a bare 12345) is stored as 12345
+    if value is None or isinstance(value, (int, float)):
+        return value
+    accession = str(value).split("|")[0].split(",")[0].strip()
+    if accession.upper().startswith("VCV"):
+        accession = accession[3:]
+    accession = accession.split(".")[0]
+    return int(accession) if accession.isdigit() else None
+
+def snv_urls(chrom, pos, ref, alt, dbsnp_id):
+    end = pos + len(ref) - 1
+    variant_id = "-".join([chrom, str(pos), ref, alt])
+    urls = {
+        "ucsc_url": "https://genome.ucsc.edu/cgi-bin/hgTracks?db=hg38&highlight=hg38." + chrom + "%3A" + str(pos) + "-" + str(end)
+            + "&position=" + chrom + "%3A" + str(pos - 25) + "-" + str(end + 25),
+        "ensembl_url": "https://asia.ensembl.org/Homo_sapiens/Location/View?r=" + chrom + "%3A" + str(pos - 25) + "-" + str(end + 25),
+        "gnomad_url": "https://gnomad.broadinstitute.org/variant/" + variant_id + "?dataset=gnomad_r3",
+    }
+    if isinstance(dbsnp_id, str) and dbsnp_id.startswith("rs"):
+        urls["dbsnp_url"] = "https://www.ncbi.nlm.nih.gov/projects/SNP/snp_ref.cgi?rs=" + dbsnp_id[2:]
+    return urls
+
+def record_to_rows(fields, info_map):
+    """Turn one VCF data line into rows per model, one set per alt allele."""
+    chrom, pos, vcf_id, ref, alts, qual, vcf_filter, info = fields[:8]
+    if chrom.lower().startswith("chr"):
+        chrom = chrom[3:]
+    pos = int(pos)
+    info_values = parse_info(info)
+    fixed_values = {
+        "CHROM": chrom,
+        "POS": pos,
+        "ID": None if vcf_id == "." else vcf_id.split(";")[0],
+        "REF": ref,
+        "QUAL": coerce_value(qual),
+        "FILTER": "" if vcf_filter == "." else vcf_filter,
+    }
+
+    alt_list = alts.split(",")
+    rows = {model: [] for model in vcf_models}
+    for alt_index, alt in enumerate(alt_list):
+        if alt == "*" or alt == ".":
+            continue
+        variant_id = "-".join([chrom, str(pos), ref, alt])
+        mapped = {}
+        for model in vcf_models:
+            mapped[model] = {}
+            for col, source in (info_map.get(model) or {}).items():
+                if source.startswith("INFO:"):
+                    value = pick_allele_value(info_values.get(source[5:]), alt_index, len(alt_list))
+                    mapped[model][col] = coerce_value(value)
+                elif source == "ALT":
+                    mapped[model][col] = alt
+                else:
+                    mapped[model][col] = fixed_values.get(source)
+
+        variant_row = {"variant_id": variant_id, "var_type": "SNV"}
+        variant_row.update(mapped["variants"])
+        rows["variants"].append(variant_row)
+
+        snv_row = {
+            "variant": variant_id,
+            "type": "SNP" if len(ref) == 1 and len(alt) == 1 else "INDEL",
+            "length": max(len(ref), len(alt)),
+            "chr": chrom,
+            "pos": pos,
+            "ref": ref,
+            "alt": alt,
+        }
+        snv_row.update(snv_urls(chrom, pos, ref, alt, mapped["snvs"].get("dbsnp_id")))
+        if "clinvar_vcv" in mapped["snvs"]:
+            mapped["snvs"]["clinvar_vcv"] = clinvar_accession(mapped["snvs"]["clinvar_vcv"])
+        snv_row.update({col: value for col, value in mapped["snvs"].items() if value is not None})
+        rows["snvs"].append(snv_row)
+
+        for model in ["genomic_variome_frequencies", "genomic_gnomad_frequencies"]:
+            # a frequency row only exists if the vcf carried at least one of its info fields
+            if any(value is not None for col, value in mapped[model].items() if info_map[model][col].startswith("INFO:")):
+                freq_row = {"variant": variant_id}
+                freq_row.update(mapped[model])
+                rows[model].append(freq_row)
+    return rows
+
+def estimate_records(num_records, bytes_read, header_bytes, file_size):
+    """records in the whole file, extrapolated from those in the bytes read past the header so far"""
+    if bytes_read <= header_bytes:
+        return num_records
+    return max(num_records, round(num_records * (file_size - header_bytes) / (bytes_read - header_bytes)))
+
+def estimate_vcf_records(file, sample_bytes=1 << 20):
+    """
+    roughly how many records a vcf holds, from the records in its first sample_bytes on disk.
+    counting them all would read the file twice
+    """
+    num_records = 0
+    header_bytes = None
+    text, raw = open_vcf(file)
+    with text:
+        for line in text:
+            if line.startswith("#"):
+                continue
+            if header_bytes is None:
+                header_bytes = raw.tell()
+            num_records += 1
+            if raw.tell() - header_bytes >= sample_bytes:
+                return estimate_records(num_records, raw.tell(), header_bytes, os.path.getsize(file))
+    # the sample was the whole file
+    return num_records
+
+def readVCF(file, info_map, chunk_size):
+    """
+    Stream a (bgzipped) vcf, yielding the number of records read, a dataframe per model and an estimate of
+    the file's records (see estimate_records) for every chunk_size records.
+    """
+    rows = {model: [] for model in vcf_models}
+    num_records = 0
+    header_bytes = None
+    file_size = os.path.getsize(file)
+    text, raw = open_vcf(file)
+    with text as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            if header_bytes is None:
+                header_bytes = raw.tell()
+            num_records += 1
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) >= 8:
+                for model, model_rows in record_to_rows(fields, info_map).items():
+                    rows[model].extend(model_rows)
+            if num_records % chunk_size == 0:
+                yield chunk_size, {model: pd.DataFrame(model_rows) for model, model_rows in rows.items()}, \
+                    estimate_records(num_records, raw.tell(), header_bytes, file_size)
+                rows = {model: [] for model in vcf_models}
+    if num_records % chunk_size != 0:
+        yield num_records % chunk_size, {model: pd.DataFrame(model_rows) for model, model_rows in rows.items()}, num_records
@@ -0,0 +1,72 @@
+from sqlalchemy import text
+
+impact_rank = "CASE {} WHEN 'HIGH' THEN 1 WHEN 'MODERATE' THEN 2 WHEN 'LOW' THEN 3 WHEN 'MODIFIER' THEN 4 ELSE 5 END"
+
+# the lowest severity_number per variant and gene. among a variant's transcripts with that consequence,
+# the one with the highest impact gives the impact
+variant_gene_sql = """
+SELECT DISTINCT ON (vt.variant, t.gene) vt.variant, t.gene, s.severity_number, s.consequence, COALESCE(a.impact, '') AS impact
+FROM variants_transcripts vt
+JOIN transcripts t ON t.id = vt.transcript
+JOIN variants_consequences c ON c.variant_transcript = vt.id
+JOIN severities s ON s.id = c.severity
+LEFT JOIN variants_annotations a ON a.variant_transcript = vt.id
+ORDER BY vt.variant, t.gene, s.severity_number, """ + impact_rank.format("a.impact") + """
+"""
+
+# the worst of a variant's genes, for the variants in [:low, :high). variants with no consequences get the
+# empty values, clearing any left from an earlier import; only the rows whose values change are written
+variant_sql = """
+UPDATE variants v
+SET worst_severity = w.severity_number, worst_consequence = w.consequence, worst_impact = w.impact
+FROM (
+    SELECT v.id, w.severity_number, COALESCE(w.consequence, '') AS consequence, COALESCE(w.impact, '') AS impact
+    FROM variants v
+    LEFT JOIN LATERAL (
+        SELECT severity_number, consequence, impact FROM variants_genes_severities g
+        WHERE g.variant = v.id
+        ORDER BY severity_number, """ + impact_rank.format("impact") + """
+        LIMIT 1
+    ) w ON true
+    WHERE v.id >= :low AND v.id < :high
+) w
+WHERE v.id = w.id
+AND (v.worst_severity, v.worst_consequence, v.worst_impact) IS DISTINCT FROM (w.severity_number, w.consequence, w.impact)
+"""
+
+def compute_worst_consequences(engine, log=print, batch_size=50000):
+    """
+    fill variants_genes_severities and the worst_* columns of variants from the imported consequences.
+    variants_genes_severities is upserted and its stale rows deleted rather than truncated, so the export
+    isn't blocked by TRUNCATE's lock; variants is updated a range of ids per transaction, so no transaction
+    holds the locks of every changed row at once
+    """
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TEMP TABLE severity_source ON COMMIT DROP AS " + variant_gene_sql))
+        connection.execute(text("CREATE UNIQUE INDEX ON severity_source (variant, gene)"))
+        connection.execute(text("ANALYZE severity_source"))
+        connection.execute(text(
+            "INSERT INTO variants_genes_severities (variant, gene, severity_number, consequence, impact) "
+            + "SELECT variant, gene, severity_number, consequence, impact FROM severity_source "
+            + "ON CONFLICT (variant, gene) DO UPDATE SET severity_number = EXCLUDED.severity_number, "
+            + "consequence = EXCLUDED.consequence, impact = EXCLUDED.impact "
+            + "WHERE (variants_genes_severities.severity_number, variants_genes_severities.consequence, variants_genes_severities.impact) "
+            + "IS DISTINCT FROM (EXCLUDED.severity_number, EXCLUDED.consequence, EXCLUDED.impact)"
+        ))
+        connection.execute(text(
+            "DELETE FROM variants_genes_severities g "
+            + "WHERE NOT EXISTS (SELECT 1 FROM severity_source s WHERE s.variant = g.variant AND s.gene = g.gene)"
+        ))
+        pairs = connection.execute(text("SELECT COUNT(*) FROM severity_source")).scalar()
+        connection.execute(text("DROP TABLE severity_source"))
+        connection.execute(text("ANALYZE variants_genes_severities"))
+        low, last = connection.execute(text("SELECT MIN(id), MAX(id) FROM variants")).one()
+
+    variants = 0
+    while low is not None and low <= last:
+        with engine.begin() as connection:
+            variants += connection.execute(text(variant_sql), {"low": low, "high": low + batch_size}).rowcount
+        low += batch_size
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE variants"))
+    log("updated the worst consequence of " + str(variants) + " variants, across " + str(pairs) + " variant genes")
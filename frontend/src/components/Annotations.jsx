@@ -50,7 +50,7 @@ export default function Annotations({ variantAnnotations, gene, filter }) {
                                     {columns.map((column, index) => (
                                         <TableCell align="center" key={index}>
                                             {column === 'consequence'? coloredDot : ''}
-                                            {transcript[column]}
+                                            {_.isArray(transcript[column]) ? transcript[column].join(', ') : transcript[column]}
                                         </TableCell>
                                     ))}
                                 </TableRow>
@@ -61,22 +61,17 @@ export default function SNV() {
         setVariantMetadata({});
         setPopFrequencies({ genomic_gnomad_freq: {}, genomic_ibvl_freq: {} });
         setVariantAnnotations([]);
-        const fetchSNVData = async () => {
-            const json = await Api.get("snv/" + varId);
-            setVariantMetadata(json);
-            console.log('snv data', json);
-        }
-
-        const fetchFreqData = async () => {
-            const json = await Api.get("genomic_population_frequencies/" + varId);
-            setPopFrequencies(json);
-            console.log('freq data', json);
-        }
-
-        const fetchAnnData = async () => {
-            const { annotations, errors } = await Api.get("annotations/" + varId, {});
-            if (errors && errors.length > 0) {
-                setError(errors[0]);
+        // metadata, frequencies and annotations come back together from the variant endpoint
+        const fetchVariantData = async () => {
+            const { snv, frequencies, annotations, errors } = await Api.get("variant/" + varId, {});
+            setVariantMetadata(snv || {});
+            setPopFrequencies({ genomic_gnomad_freq: {}, genomic_ibvl_freq: {}, ...frequencies });
+            console.log('snv data', snv);
+            console.log('freq data', frequencies);
+            if (!annotations || annotations.length === 0) {
+                if (errors && errors.length > 0) {
+                    setError(errors[errors.length - 1]);
+                }
                 return;
             }
             setVariantAnnotations(annotations);
@@ -84,7 +79,7 @@ export default function SNV() {
         }
 
         setLoading(true);
-        Promise.all([fetchSNVData(), fetchFreqData(), fetchAnnData()]).then(() => {
+        fetchVariantData().then(() => {
             setLoading(false);
         });
 
@@ -14,3 +14,5 @@ from .genomic_variome_frequency import GenomicVariomeFrequencyAdmin
 
 from .variant import VariantAdmin
 from .snv import SNVAdmin
+
+from .import_progress import ImportProgressAdmin
@@ -0,0 +1,42 @@
+from datetime import timedelta
+from django.contrib import admin
+from ibvl.models import ImportProgress
+
+
+class ImportProgressAdmin(admin.ModelAdmin):
+    """ read-only view of the progress the importer publishes while it runs """
+
+    list_display = ('id', 'job', 'status', 'current_model', 'current_file', 'file_progress', 'overall_progress', 'throughput', 'eta', 'fail', 'missing_ref', 'updated_at')
+    list_display_links = ('id', 'job')
+    list_filter = ('status',)
+
+    @admin.display(description='file rows')
+    def file_progress(self, obj):
+        return str(obj.file_rows_done) + " / " + str(obj.file_rows_total)
+
+    @admin.display(description='rows')
+    def overall_progress(self, obj):
+        if obj.rows_total == 0:
+            return str(obj.rows_done)
+        return str(obj.rows_done) + " / " + str(obj.rows_total) + " (" + str(round(100 * obj.rows_done / obj.rows_total, 1)) + "%)"
+
+    @admin.display(description='rows/sec')
+    def throughput(self, obj):
+        return round(obj.rows_per_second, 1)
+
+    @admin.display(description='ETA')
+    def eta(self, obj):
+        if obj.status != "running" or obj.eta_seconds is None:
+            return "-"
+        return str(timedelta(seconds=round(obj.eta_seconds)))
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+admin.site.register(ImportProgress, ImportProgressAdmin)
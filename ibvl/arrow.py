@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from ibvl.fast_json import dumps
+
+# Arrow IPC stream responses for the list endpoints, for clients that send
+# Accept: application/vnd.apache.arrow.stream (pyarrow.ipc.open_stream / pandas read them without parsing json).
+# pyarrow is optional: without it the endpoints only offer json, and answer an arrow Accept with a 406
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+class ArrowStreamRenderer(BaseRenderer):
+    """
+    lets DRF negotiate arrow for the views that build arrow responses themselves (see wants_arrow).
+    what reaches render() is an error response's data, which goes out as json
+    """
+    media_type = ARROW_MEDIA_TYPE
+    format = "arrow"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get("response")
+        if response is not None:
+            response["Content-Type"] = "application/json"
+        return dumps(data)
+
+
+ARROW_RENDERERS = [ArrowStreamRenderer] if pyarrow is not None else []
+
+
+def wants_arrow(request):
+    """ whether DRF negotiated arrow, or for a plain django view, the Accept header asks for it """
+    renderer = getattr(request, "accepted_renderer", None)
+    if renderer is not None:
+        return isinstance(renderer, ArrowStreamRenderer)
+    return ARROW_MEDIA_TYPE in request.headers.get("Accept", "")
+
+
+def arrow_type(model, lookup):
+    """ the arrow type of a values_list lookup such as "variant__genomicgnomadfrequency__af_tot" """
+    parts = lookup.split("__")
+    for part in parts[:-1]:
+        model = model._meta.get_field(part).related_model
+    field = model._meta.get_field(parts[-1])
+    if field.is_relation:
+        field = field.target_field
+    internal_type = field.get_internal_type()
+    if internal_type in ("IntegerField", "AutoField", "BigIntegerField", "BigAutoField"):
+        return pyarrow.int64()
+    if internal_type == "DecimalField":
+        # float64 rather than decimal128, so pandas gets numpy columns rather than python Decimal objects
+        return pyarrow.float64()
+    return pyarrow.string()
+
+
+def arrow_schema(model, columns, metadata=None):
+    """ schema for values_list(*columns.values()) rows of model, with the columns' keys as names """
+    return pyarrow.schema(
+        [pyarrow.field(name, arrow_type(model, lookup)) for name, lookup in columns.items()],
+        metadata=metadata,
+    )
+
+
+def record_batch(schema, rows):
+    """ a record batch built column by column from a list of row tuples """
+    columns = list(zip(*rows)) if len(rows) > 0 else [()] * len(schema)
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pyarrow.types.is_floating(field.type):
+            values = [None if value is None else float(value) for value in values]
+        arrays.append(pyarrow.array(values, type=field.type))
+    return pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class _Chunks:
+    """ file-like sink for the ipc writer, emptied after every batch so the stream goes out as it's written """
+    def __init__(self):
+        self.parts = []
+        self.closed = False
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.parts)
+        self.parts = []
+        return data
+
+
+def ipc_stream(schema, row_chunks):
+    """ yields the bytes of an arrow ipc stream: the schema, then a record batch per chunk of rows """
+    sink = _Chunks()
+    writer = pyarrow.ipc.new_stream(sink, schema)
+    for rows in row_chunks:
+        if len(rows) > 0:
+            writer.write_batch(record_batch(schema, rows))
+            yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    yield chunk
+
+
+def arrow_response(model, columns, rows, metadata=None):
+    """ a list of values_list rows as one arrow stream response; metadata goes in the schema (e.g. the next cursor) """
+    schema = arrow_schema(model, columns, metadata)
+    content = b"".join(ipc_stream(schema, [rows]))
+    return HttpResponse(content, content_type=ARROW_MEDIA_TYPE)
+
+
+def streaming_arrow_response(model, columns, rows):
+    """ rows from an iterator, sent as a record batch per EXPORT_CHUNK_SIZE of them """
+    schema = arrow_schema(model, columns)
+    return StreamingHttpResponse(ipc_stream(schema, chunked(rows, settings.EXPORT_CHUNK_SIZE)), content_type=ARROW_MEDIA_TYPE)
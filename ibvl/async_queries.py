@@ -0,0 +1,26 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections
+
+# django 4.2's async ORM sends every query through one thread-sensitive executor, so the queries of
+# a request would still run one after another. these threads each keep their own database connection
+# (reused for CONN_MAX_AGE seconds), so up to ASYNC_QUERY_THREADS queries run at once
+_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_QUERY_THREADS, thread_name_prefix="variome-query")
+
+
+def _run(fn, *args, **kwargs):
+    # drop this thread's connection if it has outlived CONN_MAX_AGE or broke, as django does between requests
+    close_old_connections()
+    return fn(*args, **kwargs)
+
+
+async def run_query(fn, *args, **kwargs):
+    """ run a sync function that uses the ORM on a query thread, without blocking the event loop """
+    loop = asyncio.get_running_loop()
+    # run_in_executor doesn't carry context variables over, and ibvl.db_router needs the request's
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, partial(context.run, _run, fn, *args, **kwargs))
@@ -0,0 +1,124 @@
+import contextvars
+import itertools
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+# sends the reads of read-only API requests to the DB_REPLICAS databases, round-robin over the ones
+# that answer and have the primary's dataset generation (so a replica still replaying an import is
+# left out until it has caught up). everything else - admin, auth and sessions, writes, the importer
+# and management commands - stays on the primary
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+_replica_state = {"healthy": [], "checked_at": None}
+_check_lock = threading.Lock()
+_round_robin = itertools.count()
+
+# api endpoints that have to see their own (or the importer's) latest writes
+PRIMARY_ONLY_PATHS = (
+    "/api/csrf",
+    "/api/login",
+    "/api/logout",
+    "/api/session",
+    "/api/whoami",
+    "/api/import_progress",
+    "/api/cache_stats",
+)
+
+GENERATION_SQL = "SELECT generation FROM dataset_generation ORDER BY id LIMIT 1"
+
+
+def replica_generation(alias):
+    """ the dataset generation on a database, None when it can't be reached """
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(GENERATION_SQL)
+            row = cursor.fetchone()
+    except DatabaseError:
+        connections[alias].close()
+        return None
+    return row[0] if row is not None else 0
+
+
+def healthy_replicas():
+    """ replicas that are up and on the primary's generation, re-checked every REPLICA_CHECK_INTERVAL seconds """
+    now = time.monotonic()
+    checked_at = _replica_state["checked_at"]
+    if checked_at is not None and now - checked_at <= settings.REPLICA_CHECK_INTERVAL:
+        return _replica_state["healthy"]
+    # one thread re-checks, the others keep using the last result meanwhile
+    if not _check_lock.acquire(blocking=checked_at is None):
+        return _replica_state["healthy"]
+    try:
+        primary = replica_generation("default")
+        healthy = []
+        if primary is not None:
+            for alias in settings.REPLICA_DATABASES:
+                if replica_generation(alias) == primary:
+                    healthy.append(alias)
+        _replica_state["healthy"] = healthy
+        _replica_state["checked_at"] = time.monotonic()
+    finally:
+        _check_lock.release()
+    return _replica_state["healthy"]
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        # other apps' tables (sessions, auth, admin log) stay on the primary
+        if not _replica_reads.get() or model._meta.app_label != "ibvl":
+            return "default"
+        replicas = healthy_replicas()
+        if len(replicas) == 0:
+            return "default"
+        return replicas[next(_round_robin) % len(replicas)]
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema through replication
+        return db == "default"
+
+
+def reads_from_replicas(request):
+    return (
+        request.method in ("GET", "HEAD")
+        and request.path.startswith("/api/")
+        and not request.path.startswith(PRIMARY_ONLY_PATHS)
+    )
+
+
+class ReplicaReadsMiddleware:
+    """ lets ReplicaRouter send the reads of read-only API requests to the replicas """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _replica_reads.set(reads_from_replicas(request))
+        try:
+            return self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+
+    async def __acall__(self, request):
+        token = _replica_reads.set(reads_from_replicas(request))
+        try:
+            return await self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
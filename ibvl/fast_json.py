@@ -0,0 +1,50 @@
+import json
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.utils import encoders
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.compat import SHORT_SEPARATORS
+
+# renders json byte for byte the way DRF's JSONRenderer does, with an encoder built once instead of per response,
+# for the variant endpoints that build their data from RowSerializer rows (decimals already strings, no floats
+# but those in annotation documents). orjson would be quicker, but formats floats differently (1e-05 vs 0.00001)
+_encoder = json.JSONEncoder(
+    ensure_ascii=not api_settings.UNICODE_JSON,
+    allow_nan=not api_settings.STRICT_JSON,
+    separators=SHORT_SEPARATORS,
+    default=encoders.JSONEncoder().default,
+)
+
+# the browsable api renders every response through a template; production only serves json from these views
+VARIANT_RENDERERS = api_settings.DEFAULT_RENDERER_CLASSES if settings.DEBUG else [JSONRenderer]
+
+
+def dumps(data):
+    ret = _encoder.encode(data)
+    # as JSONRenderer, keep the output a strict javascript subset
+    ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+    return ret.encode()
+
+
+class PrerenderedJSONResponse(HttpResponse):
+    """ a response a view rendered itself. keeps its data, so the response cache can render it for other formats """
+    def __init__(self, data, status=200):
+        super().__init__(dumps(data), status=status, content_type="application/json")
+        self.data = data
+
+
+def wants_json(request):
+    """ False when DRF negotiated another renderer (the browsable api) or indented json for the request """
+    renderer = getattr(request, "accepted_renderer", None)
+    if renderer is None:
+        return True
+    return renderer.format == "json" and "indent" not in (request.accepted_media_type or "")
+
+
+def api_response(request, data, status=200):
+    """ for @api_view views: the data rendered here when the client takes plain json, a DRF Response otherwise """
+    if wants_json(request):
+        return PrerenderedJSONResponse(data, status=status)
+    return Response(data, status=status)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sqlalchemy import create_engine
+
+from data.import_script.cluster import cluster_tables
+
+
+class Command(BaseCommand):
+    help = 'rewrites snvs in (chr, pos) order for region scans. locks the table until done, so run it in a maintenance window'
+
+    def handle(self, *args, **options):
+        engine = create_engine(settings.DB, echo=False)
+        cluster_tables(engine)
+        engine.dispose()
@@ -0,0 +1,31 @@
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from natsort import natsorted
+from sqlalchemy import create_engine
+
+from data.import_script.rebuild_maps import rebuild_maps, get_jobs_dir, id_models
+
+
+class Command(BaseCommand):
+    help = 'rebuilds the importer pk maps from the database into a job dir, so an import can resume with COPY_MAPS_FROM_JOB'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='models to rebuild maps for (default: all of ' + ', '.join(id_models) + ')')
+        parser.add_argument('--job', help='job dir number to write the maps into (default: a new job dir)')
+        parser.add_argument('--fetch-size', type=int, default=100000, help='rows fetched per round trip from the server-side cursor')
+
+    def handle(self, *args, **options):
+        jobs_dir = get_jobs_dir()
+        os.makedirs(jobs_dir, exist_ok=True)
+        job = options['job']
+        if job is None:
+            without_hidden = [f for f in os.listdir(jobs_dir) if not f.startswith('.')]
+            job = str(int(natsorted(without_hidden)[-1]) + 1) if len(without_hidden) > 0 else "1"
+        job_dir = os.path.join(jobs_dir, job)
+
+        engine = create_engine(settings.DB, echo=False)
+        print("rebuilding maps into " + job_dir)
+        rebuild_maps(engine, job_dir, models=options['models'], fetch_size=options['fetch_size'])
+        engine.dispose()
+        print("done. resume the import with COPY_MAPS_FROM_JOB=" + job)
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sqlalchemy import create_engine
+
+from data.import_script.search_index import build_search_index
+
+
+class Command(BaseCommand):
+    help = 'rebuilds the gene / rsID / HGVS search index from the imported tables (import_ibvl does this when it finishes)'
+
+    def handle(self, *args, **options):
+        engine = create_engine(settings.DB, echo=False)
+        build_search_index(engine)
+        engine.dispose()
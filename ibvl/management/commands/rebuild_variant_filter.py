@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sqlalchemy import create_engine
+
+from data.import_script.variant_bloom import build_variant_filter
+
+
+class Command(BaseCommand):
+    help = 'rebuilds the variant_id bloom filter at VARIANT_FILTER_PATH for the current data (import_ibvl does this when it finishes)'
+
+    def handle(self, *args, **options):
+        engine = create_engine(settings.DB, echo=False)
+        build_variant_filter(engine)
+        engine.dispose()
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sqlalchemy import create_engine
+
+from data.import_script.summaries import refresh_summaries
+
+
+class Command(BaseCommand):
+    help = 'refreshes the gene summary materialized views from the imported tables (import_ibvl does this when it finishes)'
+
+    def handle(self, *args, **options):
+        engine = create_engine(settings.DB, echo=False)
+        refresh_summaries(engine)
+        engine.dispose()
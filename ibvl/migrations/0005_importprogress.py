@@ -0,0 +1,40 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0004_rename_genomicibvlfrequency_genomicvariomefrequency_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportProgress',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job', models.CharField(max_length=30)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('finished', 'Finished'), ('terminated', 'Terminated')], default='running', max_length=20)),
+                ('started_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField(null=True)),
+                ('current_model', models.CharField(blank=True, default='', max_length=100)),
+                ('current_file', models.CharField(blank=True, default='', max_length=255)),
+                ('file_rows_done', models.BigIntegerField(default=0)),
+                ('file_rows_total', models.BigIntegerField(default=0)),
+                ('rows_done', models.BigIntegerField(default=0)),
+                ('rows_total', models.BigIntegerField(default=0)),
+                ('rows_per_second', models.FloatField(default=0)),
+                ('eta_seconds', models.FloatField(null=True)),
+                ('success', models.BigIntegerField(default=0)),
+                ('fail', models.BigIntegerField(default=0)),
+                ('missing_ref', models.BigIntegerField(default=0)),
+                ('duplicate', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'Import Progress',
+                'db_table': 'import_progress',
+            },
+        ),
+    ]
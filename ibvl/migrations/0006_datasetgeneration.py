@@ -0,0 +1,24 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0005_importprogress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetGeneration',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('generation', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dataset_generation',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:12
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0006_datasetgeneration'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='variant',
+            index=models.Index(django.db.models.functions.comparison.Collate('variant_id', 'C'), name='variants_variant_id_c_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:14
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0007_variant_id_prefix_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term_type', models.CharField(choices=[('gene', 'Gene symbol'), ('rsid', 'dbSNP rsID'), ('hgvsc', 'HGVS c.'), ('hgvsp', 'HGVS p.')], max_length=10)),
+                ('term', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255)),
+                ('variant_count', models.IntegerField(default=0)),
+                ('variants', models.ManyToManyField(db_table='search_terms_variants', related_name='search_terms', to='ibvl.variant')),
+            ],
+            options={
+                'db_table': 'search_terms',
+                'indexes': [models.Index(django.db.models.functions.comparison.Collate('key', 'C'), name='search_terms_key_c_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(fields=('term_type', 'key'), name='search_terms_type_key_unique'),
+        ),
+    ]
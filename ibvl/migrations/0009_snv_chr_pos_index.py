@@ -0,0 +1,17 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0008_searchterm'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='snv',
+            index=models.Index(fields=['chr', 'pos', 'id'], name='snvs_chr_pos_idx'),
+        ),
+    ]
@@ -0,0 +1,94 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def frequency_bin(af):
+    return (
+        "CASE WHEN " + af + " IS NULL THEN 'absent' WHEN " + af + " = 0 THEN '0' "
+        + "WHEN " + af + " < 0.001 THEN '<0.001' WHEN " + af + " < 0.01 THEN '0.001-0.01' "
+        + "WHEN " + af + " < 0.05 THEN '0.01-0.05' ELSE '>=0.05' END"
+    )
+
+
+# one row per gene, so /api/gene reads a single row through gene_summaries_short_name_idx.
+# the unique index on gene is what lets the importer REFRESH ... CONCURRENTLY
+create_gene_summaries = """
+CREATE MATERIALIZED VIEW gene_summaries AS
+WITH gene_variants AS (
+    SELECT DISTINCT t.gene, vt.variant
+    FROM transcripts t JOIN variants_transcripts vt ON vt.transcript = t.id
+),
+consequences AS (
+    SELECT t.gene, s.consequence AS bin, COUNT(DISTINCT vt.variant) AS n
+    FROM transcripts t
+    JOIN variants_transcripts vt ON vt.transcript = t.id
+    JOIN variants_consequences c ON c.variant_transcript = vt.id
+    JOIN severities s ON s.id = c.severity
+    GROUP BY t.gene, s.consequence
+),
+impacts AS (
+    SELECT t.gene, a.impact AS bin, COUNT(DISTINCT vt.variant) AS n
+    FROM transcripts t
+    JOIN variants_transcripts vt ON vt.transcript = t.id
+    JOIN variants_annotations a ON a.variant_transcript = vt.id
+    WHERE a.impact <> ''
+    GROUP BY t.gene, a.impact
+),
+variome_bins AS (
+    SELECT gv.gene, """ + frequency_bin("f.af_tot") + """ AS bin, COUNT(*) AS n
+    FROM gene_variants gv LEFT JOIN genomic_variome_frequencies f ON f.variant = gv.variant
+    GROUP BY 1, 2
+),
+gnomad_bins AS (
+    SELECT gv.gene, """ + frequency_bin("f.af_tot") + """ AS bin, COUNT(*) AS n
+    FROM gene_variants gv LEFT JOIN genomic_gnomad_frequencies f ON f.variant = gv.variant
+    GROUP BY 1, 2
+)
+SELECT
+    g.id AS gene,
+    g.short_name,
+    COALESCE(vc.n, 0) AS variant_count,
+    COALESCE(c.counts, '{}'::jsonb) AS consequence_counts,
+    COALESCE(i.counts, '{}'::jsonb) AS impact_counts,
+    COALESCE(vb.counts, '{}'::jsonb) AS variome_frequency_bins,
+    COALESCE(gb.counts, '{}'::jsonb) AS gnomad_frequency_bins
+FROM genes g
+LEFT JOIN (SELECT gene, COUNT(*) AS n FROM gene_variants GROUP BY gene) vc ON vc.gene = g.id
+LEFT JOIN (SELECT gene, jsonb_object_agg(bin, n) AS counts FROM consequences GROUP BY gene) c ON c.gene = g.id
+LEFT JOIN (SELECT gene, jsonb_object_agg(bin, n) AS counts FROM impacts GROUP BY gene) i ON i.gene = g.id
+LEFT JOIN (SELECT gene, jsonb_object_agg(bin, n) AS counts FROM variome_bins GROUP BY gene) vb ON vb.gene = g.id
+LEFT JOIN (SELECT gene, jsonb_object_agg(bin, n) AS counts FROM gnomad_bins GROUP BY gene) gb ON gb.gene = g.id;
+
+CREATE UNIQUE INDEX gene_summaries_gene_idx ON gene_summaries (gene);
+CREATE UNIQUE INDEX gene_summaries_short_name_idx ON gene_summaries (short_name);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0009_snv_chr_pos_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(create_gene_summaries, "DROP MATERIALIZED VIEW IF EXISTS gene_summaries"),
+        migrations.CreateModel(
+            name='GeneSummary',
+            fields=[
+                ('gene', models.OneToOneField(db_column='gene', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='summary', serialize=False, to='ibvl.gene')),
+                ('short_name', models.CharField(max_length=30)),
+                ('variant_count', models.IntegerField()),
+                ('consequence_counts', models.JSONField()),
+                ('impact_counts', models.JSONField()),
+                ('variome_frequency_bins', models.JSONField()),
+                ('gnomad_frequency_bins', models.JSONField()),
+            ],
+            options={
+                'verbose_name_plural': 'Gene Summaries',
+                'db_table': 'gene_summaries',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0010_gene_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VariantAnnotationDocument',
+            fields=[
+                ('variant', models.OneToOneField(db_column='variant', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='annotation_document', serialize=False, to='ibvl.variant')),
+                ('annotations', models.JSONField()),
+            ],
+            options={
+                'db_table': 'variant_annotation_documents',
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0011_variant_annotation_documents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VariantGeneSeverity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('severity_number', models.IntegerField()),
+                ('consequence', models.CharField(max_length=100)),
+                ('impact', models.CharField(blank=True, default='', max_length=20)),
+            ],
+            options={
+                'verbose_name_plural': 'Variant Gene Severities',
+                'db_table': 'variants_genes_severities',
+            },
+        ),
+        migrations.AddField(
+            model_name='variant',
+            name='worst_consequence',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='variant',
+            name='worst_impact',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='variant',
+            name='worst_severity',
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='variant',
+            index=models.Index(fields=['worst_severity'], name='variants_worst_severity_idx'),
+        ),
+        migrations.AddField(
+            model_name='variantgeneseverity',
+            name='gene',
+            field=models.ForeignKey(db_column='gene', on_delete=django.db.models.deletion.CASCADE, to='ibvl.gene'),
+        ),
+        migrations.AddField(
+            model_name='variantgeneseverity',
+            name='variant',
+            field=models.ForeignKey(db_column='variant', on_delete=django.db.models.deletion.CASCADE, to='ibvl.variant'),
+        ),
+        migrations.AddIndex(
+            model_name='variantgeneseverity',
+            index=models.Index(fields=['gene', 'severity_number'], name='variants_genes_sev_gene_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='variantgeneseverity',
+            constraint=models.UniqueConstraint(fields=('variant', 'gene'), name='variants_genes_severities_unique'),
+        ),
+    ]
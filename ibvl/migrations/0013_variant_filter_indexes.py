@@ -0,0 +1,37 @@
+# Generated by Django 4.2.1 on 2026-10-18 22:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0012_worst_consequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='genomicgnomadfrequency',
+            index=models.Index(fields=['af_tot', 'variant'], name='gnomad_freq_af_tot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genomicgnomadfrequency',
+            index=models.Index(fields=['af_popmax', 'variant'], name='gnomad_freq_af_popmax_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genomicvariomefrequency',
+            index=models.Index(fields=['af_tot', 'variant'], name='variome_freq_af_tot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snv',
+            index=models.Index(fields=['cadd_score'], name='snvs_cadd_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='snv',
+            index=models.Index(condition=models.Q(('splice_ai__isnull', False)), fields=['splice_ai'], name='snvs_splice_ai_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='variant',
+            index=models.Index(fields=['worst_impact', 'id'], name='variants_worst_impact_idx'),
+        ),
+    ]
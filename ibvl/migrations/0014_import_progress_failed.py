@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-18 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ibvl', '0013_variant_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='importprogress',
+            name='status',
+            field=models.CharField(choices=[('running', 'Running'), ('finished', 'Finished'), ('terminated', 'Terminated'), ('failed', 'Failed')], default='running', max_length=20),
+        ),
+    ]
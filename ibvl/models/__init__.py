@@ -8,4 +8,10 @@ from .variant_annotation import VariantAnnotation
 from .variant_consequence import VariantConsequence
 from .snv import SNV
 from .genomic_variome_frequency import GenomicVariomeFrequency
-from .genomic_gnomad_frequency import GenomicGnomadFrequency
\ No newline at end of file
+from .genomic_gnomad_frequency import GenomicGnomadFrequency
+from .import_progress import ImportProgress
+from .dataset_generation import DatasetGeneration
+from .search_term import SearchTerm
+from .gene_summary import GeneSummary
+from .variant_annotation_document import VariantAnnotationDocument
+from .variant_gene_severity import VariantGeneSeverity
\ No newline at end of file
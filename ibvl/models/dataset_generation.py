@@ -0,0 +1,27 @@
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
+
+
+class DatasetGeneration(models.Model):
+    """ a single row counting completed imports, so anything derived from the data can tell it is stale """
+    generation = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "dataset_generation"
+
+    def __str__(self):
+        return str(self.generation)
+
+    @classmethod
+    def current(cls):
+        row = cls.objects.values_list("generation", flat=True).order_by("id").first()
+        return row or 0
+
+    @classmethod
+    def bump(cls):
+        updated = cls.objects.update(generation=F("generation") + 1, updated_at=timezone.now())
+        if updated == 0:
+            cls.objects.create(generation=1)
+        return cls.current()
@@ -0,0 +1,27 @@
+from django.db import models
+from .gene import Gene
+
+
+class GeneSummary(models.Model):
+    """
+    per gene variant counts, read from the gene_summaries materialized view.
+    the importer refreshes it when it finishes; the view itself is created by migration 0010
+    """
+    gene = models.OneToOneField(Gene, on_delete=models.DO_NOTHING, primary_key=True, db_column='gene', related_name='summary')
+    short_name = models.CharField(max_length=30)
+    variant_count = models.IntegerField()
+    # {consequence: distinct variants with it on any of the gene's transcripts}
+    consequence_counts = models.JSONField()
+    # {impact: distinct variants}
+    impact_counts = models.JSONField()
+    # {allele frequency bin: variants}, "absent" for variants without a frequency row
+    variome_frequency_bins = models.JSONField()
+    gnomad_frequency_bins = models.JSONField()
+
+    class Meta:
+        managed = False
+        db_table = "gene_summaries"
+        verbose_name_plural = 'Gene Summaries'
+
+    def __str__(self):
+        return self.short_name
@@ -13,6 +13,11 @@ class GenomicGnomadFrequency(models.Model):
     class Meta:
         db_table = "genomic_gnomad_frequencies"
         verbose_name_plural = 'Genomic Gnomad Frequencies'
+        indexes = [
+            # rare variant filters of /api/variants
+            models.Index(fields=["af_tot", "variant"], name="gnomad_freq_af_tot_idx"),
+            models.Index(fields=["af_popmax", "variant"], name="gnomad_freq_af_popmax_idx"),
+        ]
 
     def __str__(self):
         return self.variant.variant_id
\ No newline at end of file
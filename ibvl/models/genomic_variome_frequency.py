@@ -21,6 +21,10 @@ class GenomicVariomeFrequency(models.Model):
     class Meta:
         db_table = "genomic_variome_frequencies"
         verbose_name_plural = 'Genomic Variome Frequencies'
+        indexes = [
+            # rare variant filters of /api/variants
+            models.Index(fields=["af_tot", "variant"], name="variome_freq_af_tot_idx"),
+        ]
 
     def __str__(self):
         return self.variant.variant_id
\ No newline at end of file
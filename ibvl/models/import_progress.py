@@ -0,0 +1,36 @@
+from django.db import models
+
+
+STATUS_CHOICES = [
+    ("running", "Running"),
+    ("finished", "Finished"),
+    ("terminated", "Terminated"),
+    ("failed", "Failed"),
+]
+
+
+class ImportProgress(models.Model):
+    job = models.CharField(max_length=30)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="running")
+    started_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    finished_at = models.DateTimeField(null=True)
+    current_model = models.CharField(max_length=100, blank=True, default="")
+    current_file = models.CharField(max_length=255, blank=True, default="")
+    file_rows_done = models.BigIntegerField(default=0)
+    file_rows_total = models.BigIntegerField(default=0)
+    rows_done = models.BigIntegerField(default=0)
+    rows_total = models.BigIntegerField(default=0)
+    rows_per_second = models.FloatField(default=0)
+    eta_seconds = models.FloatField(null=True)
+    success = models.BigIntegerField(default=0)
+    fail = models.BigIntegerField(default=0)
+    missing_ref = models.BigIntegerField(default=0)
+    duplicate = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "import_progress"
+        verbose_name_plural = 'Import Progress'
+
+    def __str__(self):
+        return "job " + self.job
@@ -0,0 +1,33 @@
+from django.db import models
+from django.db.models.functions import Collate
+from .variant import Variant
+
+
+TERM_TYPE_CHOICES = [
+    ("gene", "Gene symbol"),
+    ("rsid", "dbSNP rsID"),
+    ("hgvsc", "HGVS c."),
+    ("hgvsp", "HGVS p."),
+]
+
+
+class SearchTerm(models.Model):
+    """ an identifier users search by, and the variants it refers to. rebuilt after every import """
+    term_type = models.CharField(max_length=10, choices=TERM_TYPE_CHOICES)
+    term = models.CharField(max_length=255)
+    # upper case term, which searches are matched against
+    key = models.CharField(max_length=255)
+    variant_count = models.IntegerField(default=0)
+    variants = models.ManyToManyField(Variant, db_table="search_terms_variants", related_name="search_terms")
+
+    class Meta:
+        db_table = "search_terms"
+        constraints = [
+            models.UniqueConstraint(fields=["term_type", "key"], name="search_terms_type_key_unique"),
+        ]
+        indexes = [
+            models.Index(Collate("key", "C"), name="search_terms_key_c_idx"),
+        ]
+
+    def __str__(self):
+        return self.term_type + ": " + self.term
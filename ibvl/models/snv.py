@@ -23,6 +23,14 @@ class SNV(models.Model):
 
     class Meta:
         db_table = "snvs"
+        indexes = [
+            # region queries and their keyset pagination walk this in order.
+            # the importer CLUSTERs snvs on it so a region's rows sit together on disk
+            models.Index(fields=["chr", "pos", "id"], name="snvs_chr_pos_idx"),
+            # for the /api/variants score filters
+            models.Index(fields=["cadd_score"], name="snvs_cadd_score_idx"),
+            models.Index(fields=["splice_ai"], name="snvs_splice_ai_idx", condition=models.Q(splice_ai__isnull=False)),
+        ]
 
     def __str__(self):
         return self.variant.variant_id
\ No newline at end of file
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Collate
 
 
 VAR_CHOICES = [
@@ -12,9 +13,20 @@ class Variant(models.Model):
     variant_id = models.CharField(max_length=255, unique=True)
     var_type = models.CharField(max_length=30, choices=VAR_CHOICES)
     filter = models.CharField(max_length=100, blank=True, default="")
+    # most severe consequence over all the variant's transcripts, filled in by the importer once consequences are loaded
+    worst_severity = models.IntegerField(null=True)
+    worst_consequence = models.CharField(max_length=100, blank=True, default="")
+    worst_impact = models.CharField(max_length=20, blank=True, default="")
 
     class Meta:
         db_table = "variants"
+        indexes = [
+            # byte-order index so prefix searches (LIKE 'x%') and ordering by it
+            # can both use the index, whatever the database's default collation
+            models.Index(Collate("variant_id", "C"), name="variants_variant_id_c_idx"),
+            models.Index(fields=["worst_severity"], name="variants_worst_severity_idx"),
+            models.Index(fields=["worst_impact", "id"], name="variants_worst_impact_idx"),
+        ]
 
     def __str__(self):
         return self.variant_id
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.db import models
+from .variant import Variant
+
+
+class VariantAnnotationDocument(models.Model):
+    """
+    a variant's transcript annotations, already grouped by gene in the shape /api/annotations returns.
+    written by the importer after all tables are loaded
+    """
+    variant = models.OneToOneField(Variant, on_delete=models.CASCADE, primary_key=True, db_column='variant', related_name='annotation_document')
+    annotations = models.JSONField()
+
+    class Meta:
+        db_table = "variant_annotation_documents"
+
+    def __str__(self):
+        return self.variant.variant_id
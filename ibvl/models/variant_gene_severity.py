@@ -0,0 +1,26 @@
+from django.db import models
+from .variant import Variant
+from .gene import Gene
+
+
+class VariantGeneSeverity(models.Model):
+    """ most severe consequence of a variant over one gene's transcripts, filled in by the importer """
+    variant = models.ForeignKey(Variant, on_delete=models.CASCADE, db_column='variant')
+    gene = models.ForeignKey(Gene, on_delete=models.CASCADE, db_column='gene')
+    severity_number = models.IntegerField()
+    consequence = models.CharField(max_length=100)
+    impact = models.CharField(max_length=20, blank=True, default="")
+
+    class Meta:
+        db_table = "variants_genes_severities"
+        verbose_name_plural = 'Variant Gene Severities'
+        constraints = [
+            models.UniqueConstraint(fields=["variant", "gene"], name="variants_genes_severities_unique"),
+        ]
+        indexes = [
+            # "variants of this gene at least this severe" reads one range of this
+            models.Index(fields=["gene", "severity_number"], name="variants_genes_sev_gene_idx"),
+        ]
+
+    def __str__(self):
+        return self.variant.variant_id + " " + self.gene.short_name + ": " + self.consequence
@@ -0,0 +1,345 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from rest_framework.response import Response
+
+from ibvl.async_queries import run_query
+from ibvl.fast_json import PrerenderedJSONResponse, wants_json
+from ibvl.models import DatasetGeneration
+
+# responses are cached per dataset generation: an import bumps the generation,
+# so entries from before it are never looked up again and age out on their own.
+# the same key gives each response a strong ETag, which changes with the generation too
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+_generation = {"value": None, "checked_at": 0}
+stats = {"lru_hits": 0, "shared_hits": 0, "misses": 0, "coalesced": 0}
+# counts not yet added to the shared cache's totals, which workers add to every RESPONSE_CACHE_STATS_FLUSH_INTERVAL
+_unflushed = dict(stats)
+_flushed_at = {"value": time.monotonic()}
+_stats_lock = threading.Lock()
+
+# misses in flight, so concurrent requests for the same key wait for one computation instead of each running it
+_flights = {}
+_flights_lock = threading.Lock()
+_async_flights = {}
+# how often a worker waiting on another worker's computation looks for its entry in the shared cache
+COALESCE_POLL_INTERVAL = 0.05
+
+
+def dataset_generation():
+    """ the current dataset generation, re-read from the database at most every RESPONSE_CACHE_GENERATION_TTL seconds """
+    now = time.monotonic()
+    if _generation["value"] is None or now - _generation["checked_at"] > settings.RESPONSE_CACHE_GENERATION_TTL:
+        try:
+            _generation["value"] = DatasetGeneration.current()
+        except DatabaseError:
+            # table not migrated yet
+            _generation["value"] = 0
+        _generation["checked_at"] = now
+    return _generation["value"]
+
+
+def cache_key(endpoint, variant_id, params, generation=None):
+    if generation is None:
+        generation = dataset_generation()
+    params_key = "&".join(key + "=" + ",".join(params.getlist(key)) for key in sorted(params.keys()))
+    raw = endpoint + "|" + variant_id + "|" + params_key
+    # hashed so any variant_id or query string makes a valid memcached/redis key
+    return "variome:response:" + str(generation) + ":" + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def _count(stat):
+    """ counts in the process: a lookup, an lru hit above all, mustn't cost a round trip to the shared cache """
+    with _stats_lock:
+        stats[stat] += 1
+        _unflushed[stat] += 1
+        if time.monotonic() - _flushed_at["value"] < settings.RESPONSE_CACHE_STATS_FLUSH_INTERVAL:
+            return
+    flush_stats()
+
+
+def flush_stats():
+    """ adds the process' counts since its last flush to the totals across workers """
+    with _stats_lock:
+        counts = dict(_unflushed)
+        for stat in _unflushed:
+            _unflushed[stat] = 0
+        _flushed_at["value"] = time.monotonic()
+    for stat, count in counts.items():
+        if count == 0:
+            continue
+        try:
+            if not cache.add("variome:stats:" + stat, count, timeout=None):
+                cache.incr("variome:stats:" + stat, count)
+        except Exception:
+            pass
+
+
+def cache_stats():
+    """ the shared totals are each worker's counts as of its last flush """
+    flush_stats()
+    shared = {}
+    for stat in stats:
+        try:
+            shared[stat] = cache.get("variome:stats:" + stat, 0)
+        except Exception:
+            shared[stat] = None
+    return {
+        "generation": dataset_generation(),
+        "process": dict(stats),
+        "shared": shared,
+        "lru_entries": len(_lru),
+    }
+
+
+def lru_get(key):
+    with _lru_lock:
+        if key in _lru:
+            _lru.move_to_end(key)
+            return _lru[key]
+    return None
+
+
+def lru_set(key, value):
+    with _lru_lock:
+        _lru[key] = value
+        _lru.move_to_end(key)
+        while len(_lru) > settings.RESPONSE_CACHE_LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def get_cached(key):
+    entry = lru_get(key)
+    if entry is not None:
+        _count("lru_hits")
+        return entry
+    entry = cache.get(key)
+    if entry is not None:
+        _count("shared_hits")
+        lru_set(key, entry)
+        return entry
+    _count("misses")
+    return None
+
+
+def set_cached(key, entry):
+    lru_set(key, entry)
+    cache.set(key, entry, timeout=settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def response_from_entry(entry, render=False):
+    """ render=True for json clients and views outside DRF, a Response for DRF to render otherwise """
+    if entry["type"] == "data":
+        if render:
+            return PrerenderedJSONResponse(entry["data"], status=entry["status"])
+        return Response(entry["data"], status=entry["status"])
+    return HttpResponse(entry["content"], status=entry["status"], content_type=entry["content_type"])
+
+
+def entry_from_response(response):
+    if isinstance(response, (Response, PrerenderedJSONResponse)):
+        return {"type": "data", "data": response.data, "status": response.status_code}
+    return {"type": "content", "content": response.content, "status": response.status_code, "content_type": response["Content-Type"]}
+
+
+def etag(key, request):
+    # the same resource renders differently for different Accept headers (json vs the browsable api)
+    accept = request.META.get("HTTP_ACCEPT", "")
+    return '"' + hashlib.sha1((key + "|" + accept).encode()).hexdigest() + '"'
+
+
+def etag_matches(request, tag):
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is None:
+        return False
+    return tag in [candidate.strip() for candidate in if_none_match.split(",")]
+
+
+def add_validators(response, tag):
+    response["ETag"] = tag
+    response["Cache-Control"] = "public, max-age=" + str(settings.RESPONSE_MAX_AGE)
+    patch_vary_headers(response, ["Accept"])
+    return response
+
+
+def cached_lookup(endpoint, request, variant_id, render=False):
+    """ (key, tag, response) where response is a 304 or a cache hit, or None when the view has to run """
+    key = cache_key(endpoint, variant_id, request.GET)
+    tag = etag(key, request)
+    if etag_matches(request, tag):
+        return key, tag, add_validators(HttpResponseNotModified(), tag)
+    if settings.RESPONSE_CACHE_ENABLED:
+        entry = get_cached(key)
+        if entry is not None:
+            return key, tag, add_validators(response_from_entry(entry, render=render or wants_json(request)), tag)
+    return key, tag, None
+
+
+def cache_store(key, tag, response):
+    if response.status_code == 200:
+        if settings.RESPONSE_CACHE_ENABLED:
+            set_cached(key, entry_from_response(response))
+        add_validators(response, tag)
+    return response
+
+
+class Flight:
+    """ a miss being computed in this process; followers wait on done, then use entry (None if the leader failed) """
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry = None
+
+
+def shared_response(entry, tag, request, render=False):
+    """ a response for a follower, from the entry another request computed """
+    _count("coalesced")
+    response = response_from_entry(entry, render=render or wants_json(request))
+    return add_validators(response, tag) if entry["status"] == 200 else response
+
+
+def claim(key):
+    """ True for the one worker that gets to compute key, through an atomic add on the shared cache """
+    return cache.add(key + ":computing", 1, timeout=settings.RESPONSE_CACHE_COALESCE_LOCK_TIMEOUT)
+
+
+def release(key):
+    cache.delete(key + ":computing")
+
+
+def poll_shared(key):
+    """ (the entry another worker computed, or None, and whether it is still computing) """
+    entry = cache.get(key)
+    if entry is not None:
+        lru_set(key, entry)
+        return entry, False
+    return None, cache.get(key + ":computing") is not None
+
+
+def compute_once(key, tag, request, compute):
+    """
+    across workers: the one that claims key computes it, the others wait for its entry to land in the
+    shared cache. they compute it themselves if it doesn't (not a 200, or the claimer died) before the wait is up
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return cache_store(key, tag, compute())
+    if claim(key):
+        try:
+            return cache_store(key, tag, compute())
+        finally:
+            release(key)
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_COALESCE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(COALESCE_POLL_INTERVAL)
+        entry, computing = poll_shared(key)
+        if entry is not None:
+            return shared_response(entry, tag, request)
+        if not computing:
+            break
+    return cache_store(key, tag, compute())
+
+
+def single_flight(key, tag, request, compute):
+    """ within the process: the first request for key computes it, concurrent ones share its result """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = Flight()
+    if not leader:
+        if flight.done.wait(settings.RESPONSE_CACHE_COALESCE_WAIT) and flight.entry is not None:
+            return shared_response(flight.entry, tag, request)
+        return cache_store(key, tag, compute())
+    try:
+        response = compute_once(key, tag, request, compute)
+        flight.entry = entry_from_response(response)
+        return response
+    finally:
+        with _flights_lock:
+            _flights.pop(key, None)
+        flight.done.set()
+
+
+async def async_compute_once(key, tag, request, compute):
+    """ compute_once for async views, waiting with asyncio.sleep """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return await run_query(cache_store, key, tag, await compute())
+    if await run_query(claim, key):
+        try:
+            return await run_query(cache_store, key, tag, await compute())
+        finally:
+            await run_query(release, key)
+    deadline = time.monotonic() + settings.RESPONSE_CACHE_COALESCE_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(COALESCE_POLL_INTERVAL)
+        entry, computing = await run_query(poll_shared, key)
+        if entry is not None:
+            return await run_query(shared_response, entry, tag, request, render=True)
+        if not computing:
+            break
+    return await run_query(cache_store, key, tag, await compute())
+
+
+async def async_single_flight(key, tag, request, compute):
+    """ single_flight for async views: followers await the leader's future on the event loop """
+    flight = _async_flights.get(key)
+    if flight is not None:
+        try:
+            entry = await asyncio.wait_for(asyncio.shield(flight), settings.RESPONSE_CACHE_COALESCE_WAIT)
+        except asyncio.TimeoutError:
+            entry = None
+        if entry is not None:
+            return await run_query(shared_response, entry, tag, request, render=True)
+        return await run_query(cache_store, key, tag, await compute())
+    flight = _async_flights[key] = asyncio.get_running_loop().create_future()
+    entry = None
+    try:
+        response = await async_compute_once(key, tag, request, compute)
+        entry = entry_from_response(response)
+        return response
+    finally:
+        _async_flights.pop(key, None)
+        flight.set_result(entry)
+
+
+def cached_response(endpoint):
+    """
+    caches a variant view's successful responses per (endpoint, variant_id, query params, dataset generation),
+    and gives them an ETag from the same key so If-None-Match requests get a 304 without touching the database.
+    goes under @api_view so DRF still renders the cached data for the requested format.
+    async views get an async wrapper, with the cache and generation lookups run on the query threads (ibvl.async_queries)
+    rather than sync_to_async's one thread-sensitive thread, which would serialize them across requests.
+    concurrent misses for the same key are coalesced (single_flight), in the process and across workers
+    """
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, variant_id, *args, **kwargs):
+                if request.method != "GET":
+                    return await view(request, variant_id, *args, **kwargs)
+                key, tag, response = await run_query(cached_lookup, endpoint, request, variant_id, render=True)
+                if response is not None:
+                    return response
+                return await async_single_flight(key, tag, request, lambda: view(request, variant_id, *args, **kwargs))
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, variant_id, *args, **kwargs):
+            if request.method != "GET":
+                return view(request, variant_id, *args, **kwargs)
+            key, tag, response = cached_lookup(endpoint, request, variant_id)
+            if response is not None:
+                return response
+            return single_flight(key, tag, request, lambda: view(request, variant_id, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -9,3 +9,6 @@ from .variant_annotation_serializer import VariantAnnotationSerializer
 from .variant_consequence_serializer import VariantConsequenceSerializer
 from .genomic_gnomad_serializer import GenomicGnomadFrequencySerializer
 from .genomic_variome_serializer import GenomicVariomeFrequencySerializer
+from .import_progress_serializer import ImportProgressSerializer
+from .gene_summary_serializer import GeneSummarySerializer
+from .row_serializer import RowSerializer, snv_rows, gnomad_frequency_rows, variome_frequency_rows
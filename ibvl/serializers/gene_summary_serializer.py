@@ -0,0 +1,16 @@
+from rest_framework import serializers
+
+from ibvl.models import (
+    GeneSummary
+)
+
+
+class GeneSummarySerializer(serializers.ModelSerializer):
+    """
+    """
+    class Meta:
+        model = GeneSummary
+        fields = [
+            "short_name", "variant_count", "consequence_counts", "impact_counts",
+            "variome_frequency_bins", "gnomad_frequency_bins"
+        ]
@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from ibvl.models import (
+    ImportProgress
+)
+
+
+class ImportProgressSerializer(serializers.ModelSerializer):
+    """
+    """
+    class Meta:
+        model = ImportProgress
+        fields = "__all__"
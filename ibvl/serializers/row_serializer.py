@@ -0,0 +1,109 @@
+from rest_framework import serializers
+
+from ibvl.serializers import (
+    SNVSerializer,
+    GenomicGnomadFrequencySerializer,
+    GenomicVariomeFrequencySerializer
+)
+
+
+def field_converter(field):
+    """ a function giving field.to_representation(value) for the non-null values of a model field """
+    if type(field) in (serializers.IntegerField, serializers.CharField):
+        # the database already hands back ints and strs
+        return None
+    if isinstance(field, serializers.DecimalField) and field.decimal_places is not None \
+            and getattr(field, "coerce_to_string", True) and not field.localize:
+        exponent = -field.decimal_places
+
+        def convert(value):
+            # numeric columns come back at their scale already, so DRF's quantize wouldn't change them
+            if value.as_tuple().exponent == exponent:
+                return "{:f}".format(value)
+            return field.to_representation(value)
+        return convert
+    return field.to_representation
+
+
+class RowSerializer:
+    """
+    the output of a ModelSerializer, built from .values_list(*columns) rows instead of model instances.
+    the serializer's fields are looked at once, here, rather than copied and walked for every object.
+    handles model fields and nested serializers, which is all the variant serializers have
+    """
+    def __init__(self, serializer_class, prefix=""):
+        specs = []
+        for name, field in serializer_class().fields.items():
+            if isinstance(field, serializers.BaseSerializer):
+                specs.append((name, RowSerializer(type(field), prefix + field.source + "__"), None))
+            else:
+                specs.append((name, prefix + field.source, field_converter(field)))
+        self._compile(specs)
+
+    def _compile(self, specs):
+        # specs are (name, column or nested RowSerializer, converter)
+        self.specs = specs
+        self.columns = []
+        self.fields = []
+        for name, source, convert in specs:
+            if isinstance(source, RowSerializer):
+                self.fields.append((name, len(self.columns), None, source))
+                self.columns.extend(source.columns)
+            else:
+                self.fields.append((name, len(self.columns), convert, None))
+                self.columns.append(source)
+
+    def only(self, names):
+        """
+        (a RowSerializer for just the named fields, the names it doesn't have). fields of nested serializers
+        are named like "variant.variant_id", the nested serializer's own name takes all of its fields
+        """
+        wanted = set()
+        nested_wanted = {}
+        for name in names:
+            head, _, rest = name.partition(".")
+            if rest == "":
+                wanted.add(head)
+            else:
+                nested_wanted.setdefault(head, []).append(rest)
+
+        specs = []
+        found = set()
+        for name, source, convert in self.specs:
+            if name in wanted:
+                specs.append((name, source, convert))
+                found.add(name)
+            elif name in nested_wanted and isinstance(source, RowSerializer):
+                nested, missing = source.only(nested_wanted[name])
+                found.update(name + "." + rest for rest in nested_wanted[name] if rest not in missing)
+                if len(nested.columns) > 0:
+                    specs.append((name, nested, None))
+
+        subset = RowSerializer.__new__(RowSerializer)
+        subset._compile(specs)
+        return subset, [name for name in names if name not in found]
+
+    def to_representation(self, row, offset=0):
+        data = {}
+        for name, index, convert, nested in self.fields:
+            value = row[offset + index]
+            if nested is not None:
+                # a null relation leaves all of its columns null
+                start = offset + index
+                if value is None and all(column is None for column in row[start:start + len(nested.columns)]):
+                    data[name] = None
+                else:
+                    data[name] = nested.to_representation(row, start)
+            elif value is None or convert is None:
+                data[name] = value
+            else:
+                data[name] = convert(value)
+        return data
+
+    def serialize(self, queryset):
+        return [self.to_representation(row) for row in queryset.values_list(*self.columns)]
+
+
+snv_rows = RowSerializer(SNVSerializer)
+gnomad_frequency_rows = RowSerializer(GenomicGnomadFrequencySerializer)
+variome_frequency_rows = RowSerializer(GenomicVariomeFrequencySerializer)
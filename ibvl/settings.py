@@ -16,6 +16,7 @@ import os
 import dotenv
 from pathlib import Path
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 dotenv.load_dotenv()
 
@@ -98,10 +99,82 @@ WSGI_APPLICATION = 'ibvl.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# route the variant endpoints to their async views, for ASGI deployments (ibvl/asgi.py)
+ASYNC_VIEWS = os.environ.get("ASYNC_VIEWS", "false").lower() == "true"
+
+# DB_CONN_MAX_AGE > 0 keeps connections open between requests, and on the async views' query threads (ibvl/async_queries.py),
+# which would otherwise connect for every query they run. so with ASYNC_VIEWS it defaults to 60, and can't be 0
+DB_CONN_MAX_AGE = os.environ.get("DB_CONN_MAX_AGE") or ""
+DB_CONN_MAX_AGE = int(DB_CONN_MAX_AGE) if DB_CONN_MAX_AGE != "" else (60 if ASYNC_VIEWS else 0)
+if ASYNC_VIEWS and DB_CONN_MAX_AGE == 0:
+    raise ImproperlyConfigured("ASYNC_VIEWS needs DB_CONN_MAX_AGE > 0, or every query of an async view opens a new connection")
+
 DATABASES = {
-    'default': dj_database_url.parse(DB)
+    'default': dj_database_url.parse(DB, conn_max_age=DB_CONN_MAX_AGE)
 }
 
+# comma separated read replica urls: read-only API requests are spread over them (see ibvl/db_router.py)
+DB_REPLICAS = [url.strip() for url in os.environ.get("DB_REPLICAS", "").split(",") if url.strip() != ""]
+REPLICA_DATABASES = []
+for number, url in enumerate(DB_REPLICAS, start=1):
+    alias = "replica_" + str(number)
+    DATABASES[alias] = dj_database_url.parse(url, conn_max_age=DATABASES['default']['CONN_MAX_AGE'])
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+# seconds between checks that each replica is up and has the primary's dataset generation
+REPLICA_CHECK_INTERVAL = float(os.environ.get("REPLICA_CHECK_INTERVAL") or 5)
+
+if len(REPLICA_DATABASES) > 0:
+    DATABASE_ROUTERS = ['ibvl.db_router.ReplicaRouter']
+    MIDDLEWARE.append('ibvl.db_router.ReplicaReadsMiddleware')
+
+# queries the async views can have running at once, across all requests of a worker
+ASYNC_QUERY_THREADS = int(os.environ.get("ASYNC_QUERY_THREADS") or 16)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# shared between workers when CACHE_URL points at redis, otherwise per process
+
+CACHE_URL = os.environ.get("CACHE_URL")
+
+if CACHE_URL is not None and CACHE_URL.startswith("redis"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# variant endpoint responses, see ibvl/response_cache.py
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED") not in ["false", "False"]
+RESPONSE_CACHE_LRU_SIZE = int(os.environ.get("RESPONSE_CACHE_LRU_SIZE") or 2000)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_TIMEOUT") or 60 * 60 * 24)
+RESPONSE_CACHE_GENERATION_TTL = float(os.environ.get("RESPONSE_CACHE_GENERATION_TTL") or 5)
+# seconds a request waits for a concurrent identical one to compute its response, before computing it itself
+RESPONSE_CACHE_COALESCE_WAIT = float(os.environ.get("RESPONSE_CACHE_COALESCE_WAIT") or 10)
+# expiry of the shared cache lock a worker holds while computing a response, in case it dies holding it
+RESPONSE_CACHE_COALESCE_LOCK_TIMEOUT = int(os.environ.get("RESPONSE_CACHE_COALESCE_LOCK_TIMEOUT") or 30)
+# seconds between a worker adding its hit/miss counts to the totals across workers (see /api/cache_stats)
+RESPONSE_CACHE_STATS_FLUSH_INTERVAL = float(os.environ.get("RESPONSE_CACHE_STATS_FLUSH_INTERVAL") or 60)
+# Cache-Control max-age for responses carrying a dataset generation ETag
+RESPONSE_MAX_AGE = int(os.environ.get("RESPONSE_MAX_AGE") or 60 * 60 * 24)
+
+# bloom filter of the variant ids (ibvl/variant_bloom.py), rebuilt by import_ibvl. VARIANT_FILTER_PATH=none turns it off.
+# the importer writes it where it runs, so when the api runs on other hosts this has to be on storage they share
+VARIANT_FILTER_PATH = os.environ.get("VARIANT_FILTER_PATH") or str(BASE_DIR / "data" / "variant_filter.bin")
+if VARIANT_FILTER_PATH.lower() == "none":
+    VARIANT_FILTER_PATH = None
+VARIANT_FILTER_FALSE_POSITIVE_RATE = float(os.environ.get("VARIANT_FILTER_FALSE_POSITIVE_RATE") or 0.001)
+# variant_ids per /api/exists request
+EXISTS_MAX_VARIANTS = int(os.environ.get("EXISTS_MAX_VARIANTS") or 10000)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,6 +204,19 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# most variant_ids accepted by one /api/variants/batch request
+BATCH_MAX_VARIANTS = int(os.environ.get("BATCH_MAX_VARIANTS") or 5000)
+
+# rows per /api/region page, and the most a client can ask for with ?limit=
+REGION_PAGE_SIZE = int(os.environ.get("REGION_PAGE_SIZE") or 100)
+REGION_MAX_ROWS = int(os.environ.get("REGION_MAX_ROWS") or 1000)
+# the same for /api/variants
+FILTER_PAGE_SIZE = int(os.environ.get("FILTER_PAGE_SIZE") or 100)
+FILTER_MAX_ROWS = int(os.environ.get("FILTER_MAX_ROWS") or 1000)
+
+# rows fetched per round trip from the server-side cursor behind /api/export
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE") or 2000)
+
 CORS_ORIGIN_ALLOW_ALL = False
 CORS_ALLOW_CREDENTIALS = True
 
@@ -0,0 +1,67 @@
+import signal
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+# do_import installs its SIGINT cleanup handler when imported, put the test runner's back
+_sigint = signal.getsignal(signal.SIGINT)
+from data.import_script import do_import
+signal.signal(signal.SIGINT, _sigint)
+
+
+class CompoundFKTests(SimpleTestCase):
+    def setUp(self):
+        for patcher in [
+            mock.patch.dict(do_import.pk_maps, {
+                "variants": {"22-100-A-G": 1, "22-200-C-T": 2, "22-300-G-A": 3},
+                "transcripts": {"ENST01": 10, "ENST02": 20},
+                # "<transcript id>-<variant id>" -> variants_transcripts id
+                "variants_transcripts": {"10-1": 101, "20-1": 102, "10-2": 103},
+            }, clear=True),
+            mock.patch.dict(do_import.compound_fk_index, {}, clear=True),
+            mock.patch.object(do_import, "log_output"),
+            mock.patch.object(do_import, "log_data_issue"),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_resolves_pairs(self):
+        df = pd.DataFrame({
+            "variant": ["22-100-A-G", "22-100-a-g", "22-200-C-T"],
+            "transcript": ["ENST01", "enst02", "ENST01"],
+            "hgvsc": ["a", "b", "c"],
+        })
+        resolved, missing = do_import.resolve_compound_fk(df, "variants_annotations")
+        self.assertEqual(missing, 0)
+        self.assertEqual(list(resolved.columns), ["hgvsc", "variant_transcript"])
+        self.assertEqual(resolved["variant_transcript"].tolist(), [101, 102, 103])
+
+    def test_missing_keys(self):
+        df = pd.DataFrame({
+            # unknown variant, unknown transcript, both known but not a variants_transcripts pair, NA
+            "variant": ["22-999-A-G", "22-100-A-G", "22-300-G-A", None, "22-200-C-T"],
+            "transcript": ["ENST01", "ENST99", "ENST01", "ENST01", "ENST01"],
+            "hgvsc": ["a", "b", "c", "d", "e"],
+        })
+        resolved, missing = do_import.resolve_compound_fk(df, "variants_annotations")
+        self.assertEqual(missing, 4)
+        self.assertEqual(resolved["hgvsc"].tolist(), ["e"])
+        self.assertEqual(resolved["variant_transcript"].tolist(), [103])
+
+    def test_keys_stay_distinct_up_to_the_limit(self):
+        limit = do_import.COMPOUND_ID_LIMIT
+        transcript_ids = np.array([1, 0, limit - 1, limit - 1], dtype=np.int64)
+        variant_ids = np.array([0, 1, 0, limit - 1], dtype=np.int64)
+        keys = do_import.compound_key(transcript_ids, variant_ids)
+        self.assertEqual(len(set(keys.tolist())), 4)
+
+    def test_ids_past_the_limit_are_refused(self):
+        limit = do_import.COMPOUND_ID_LIMIT
+        with self.assertRaises(ValueError):
+            do_import.compound_key(np.array([1], dtype=np.int64), np.array([limit], dtype=np.int64))
+        with self.assertRaises(ValueError):
+            do_import.compound_key(np.array([limit], dtype=np.int64), np.array([1], dtype=np.int64))
+        with self.assertRaises(ValueError):
+            do_import.compound_key(np.array([-1], dtype=np.int64), np.array([1], dtype=np.int64))
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from ibvl.fast_json import dumps
+from ibvl.models import SNV, GenomicGnomadFrequency, GenomicVariomeFrequency, Variant
+from ibvl.serializers import (
+    SNVSerializer,
+    GenomicGnomadFrequencySerializer,
+    GenomicVariomeFrequencySerializer,
+    snv_rows,
+    gnomad_frequency_rows,
+    variome_frequency_rows,
+)
+
+
+class RowSerializerTests(TestCase):
+    """ RowSerializer rows rendered by fast_json must match the DRF serializers rendered by JSONRenderer """
+
+    @classmethod
+    def setUpTestData(cls):
+        full = Variant.objects.create(variant_id="22-100-A-G", var_type="SNV")
+        sparse = Variant.objects.create(variant_id="22-200-C-T", var_type="SNV")
+        SNV.objects.create(
+            variant=full, type="SNP", length=1, chr="22", pos=100, ref="A", alt="G",
+            cadd_intr="Tolerable", cadd_score=Decimal("5.659"), dbsnp_id="rs1", dbsnp_url="https://dbsnp/rs1",
+            clinvar_vcv=Decimal("12345"), splice_ai=Decimal("-0.00001"),
+        )
+        # nullable decimals left null, blank strings
+        SNV.objects.create(variant=sparse, type="SNP", length=1, chr="22", pos=200, ref="C", alt="T")
+        GenomicGnomadFrequency.objects.create(
+            variant=full, af_tot=Decimal("0.0000100000"), af_popmax=Decimal("1"),
+            ac_tot=Decimal("3"), an_tot=Decimal("300000.5"), hom_tot=Decimal("0"),
+        )
+        GenomicGnomadFrequency.objects.create(
+            variant=sparse, af_tot=Decimal("0.5"), af_popmax=None, ac_tot=1, an_tot=2, hom_tot=0,
+        )
+        GenomicVariomeFrequency.objects.create(
+            variant=full, af_tot=Decimal("0.25"), af_xy=Decimal("0.123456789"), af_xx=None,
+            ac_tot=10, ac_xy=None, ac_xx=Decimal("4.5"), an_tot=40, an_xy=None, an_xx=None,
+            hom_tot=1, hom_xy=0, hom_xx=1, quality=Decimal("99.999"),
+        )
+
+    def assertMatchesDRF(self, rows, serializer_class, queryset):
+        expected = serializer_class(queryset, many=True).data
+        self.assertEqual(rows.serialize(queryset), expected)
+        self.assertEqual(dumps(rows.serialize(queryset)), JSONRenderer().render(expected))
+
+    def test_snvs(self):
+        self.assertMatchesDRF(snv_rows, SNVSerializer, SNV.objects.order_by("id"))
+
+    def test_gnomad_frequencies(self):
+        self.assertMatchesDRF(gnomad_frequency_rows, GenomicGnomadFrequencySerializer, GenomicGnomadFrequency.objects.order_by("id"))
+
+    def test_variome_frequencies(self):
+        self.assertMatchesDRF(variome_frequency_rows, GenomicVariomeFrequencySerializer, GenomicVariomeFrequency.objects.order_by("id"))
+
+    def test_nested_variant(self):
+        data = snv_rows.serialize(SNV.objects.order_by("id"))
+        self.assertEqual(data[0]["variant"], {"id": data[0]["variant"]["id"], "variant_id": "22-100-A-G", "var_type": "SNV"})
+        self.assertEqual(data[1]["cadd_score"], None)
+        self.assertEqual(data[0]["splice_ai"], "-0.00001")
+
+    def test_only(self):
+        rows, missing = snv_rows.only(["pos", "cadd_score", "variant.variant_id", "bogus"])
+        self.assertEqual(missing, ["bogus"])
+        full = SNVSerializer(SNV.objects.order_by("id"), many=True).data
+        self.assertEqual(rows.serialize(SNV.objects.order_by("id")), [
+            {"variant": {"variant_id": snv["variant"]["variant_id"]}, "pos": snv["pos"], "cadd_score": snv["cadd_score"]}
+            for snv in full
+        ])
@@ -0,0 +1,43 @@
+from django.test import SimpleTestCase
+
+from ibvl.views.snv_annotations import annotation_values_names, group_by_gene, severity_key
+
+
+def row(gene, transcript, consequence, severity, annotation="MODIFIER"):
+    """ a values() row of the live annotations query """
+    values = {key: None for key in annotation_values_names}
+    values.update({
+        "transcript__gene__short_name": gene,
+        "transcript__transcript_id": transcript,
+        "consequence__severity__consequence": consequence,
+        "annotation__impact": annotation,
+        severity_key: severity,
+    })
+    return values
+
+
+class GroupByGeneTests(SimpleTestCase):
+    def test_consequences_are_distinct_and_ordered_by_severity(self):
+        grouped = group_by_gene([
+            row("A", "ENST01", "intron_variant", 21),
+            row("A", "ENST01", "intron_variant", 21),
+            row("A", "ENST01", "missense_variant", 12),
+            row("A", "ENST01", None, None),
+        ])
+        self.assertEqual(len(grouped), 1)
+        self.assertEqual(grouped[0]["transcripts"][0]["consequence"], ["missense_variant", "intron_variant"])
+
+    def test_groups_genes_in_first_seen_order(self):
+        grouped = group_by_gene([
+            row("B", "ENST02", "intron_variant", 21),
+            row("A", "ENST01", "intron_variant", 21),
+            row("B", "ENST03", None, None),
+            row("B", "ENST02", "intron_variant", 21, annotation="HIGH"),
+        ])
+        self.assertEqual([gene["gene"] for gene in grouped], ["B", "A"])
+        transcripts = grouped[0]["transcripts"]
+        self.assertEqual([(t["transcript"], t["impact"]) for t in transcripts], [
+            ("ENST02", "MODIFIER"), ("ENST03", "MODIFIER"), ("ENST02", "HIGH"),
+        ])
+        self.assertEqual(transcripts[1]["consequence"], [])
+        self.assertNotIn(severity_key, transcripts[0])
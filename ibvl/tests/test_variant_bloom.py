@@ -0,0 +1,90 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ibvl import variant_bloom
+
+
+def variant_ids(start, count):
+    return ["22-" + str(position) + "-A-G" for position in range(start, start + count)]
+
+
+class FilterFileTestCase(SimpleTestCase):
+    """ writes a filter of 20000 variant ids, generation 7, to a temporary directory """
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "variant_filter.bin")
+        self.members = variant_ids(0, 20000)
+        # written in chunks, as the importer streams them
+        chunks = [self.members[i:i + 3000] for i in range(0, len(self.members), 3000)] + [[]]
+        self.num_bits, self.num_hashes = variant_bloom.write_filter(self.path, chunks, len(self.members), 7, 0.01)
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+
+class VariantBloomFilterTests(FilterFileTestCase):
+    def test_header(self):
+        bloom = variant_bloom.VariantBloomFilter(self.path)
+        self.assertEqual((bloom.num_bits, bloom.num_hashes), variant_bloom.filter_size(20000, 0.01))
+        self.assertEqual((bloom.num_bits, bloom.num_hashes), (self.num_bits, self.num_hashes))
+        self.assertEqual((bloom.generation, bloom.count), (7, 20000))
+
+    def test_no_false_negatives(self):
+        bloom = variant_bloom.VariantBloomFilter(self.path)
+        self.assertTrue(all(bloom.might_contain(variant_id) for variant_id in self.members))
+
+    def test_false_positive_rate(self):
+        bloom = variant_bloom.VariantBloomFilter(self.path)
+        others = variant_ids(1000000, 50000)
+        rate = sum(bloom.might_contain(variant_id) for variant_id in others) / len(others)
+        self.assertLess(rate, 0.02)
+
+    def test_not_a_filter(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a filter" * 10)
+        with self.assertRaises(ValueError):
+            variant_bloom.VariantBloomFilter(self.path)
+
+
+class CurrentFilterTests(FilterFileTestCase):
+    def setUp(self):
+        super().setUp()
+        self.generation = 7
+        for patcher in [
+            mock.patch.dict(variant_bloom._state, {"filter": None, "checked_at": None, "warned": False}),
+            mock.patch.object(variant_bloom, "dataset_generation", lambda: self.generation),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # the path is only known once the filter is written, so not a class decorator
+        settings = override_settings(VARIANT_FILTER_PATH=self.path, RESPONSE_CACHE_GENERATION_TTL=0)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_membership(self):
+        self.assertFalse(variant_bloom.definitely_missing(self.members[0]))
+        self.assertTrue(variant_bloom.definitely_missing("X-1-A-G"))
+        self.assertEqual(variant_bloom.maybe_present(["X-1-A-G", self.members[5]]), [self.members[5]])
+
+    def test_other_generation_isnt_trusted(self):
+        # the database was imported into after the filter was written
+        self.generation = 8
+        self.assertIsNone(variant_bloom.current_filter())
+        self.assertFalse(variant_bloom.definitely_missing("X-1-A-G"))
+        self.assertEqual(variant_bloom.maybe_present(["X-1-A-G"]), ["X-1-A-G"])
+
+    def test_missing_file_warns_once(self):
+        os.remove(self.path)
+        with self.assertLogs(variant_bloom.logger, "WARNING") as logs:
+            self.assertIsNone(variant_bloom.current_filter())
+            self.assertIsNone(variant_bloom.current_filter())
+            self.assertFalse(variant_bloom.definitely_missing("X-1-A-G"))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn("VARIANT_FILTER_PATH", logs.output[0])
+
+    @override_settings(VARIANT_FILTER_PATH=None)
+    def test_turned_off(self):
+        self.assertIsNone(variant_bloom.current_filter())
+        self.assertFalse(variant_bloom.definitely_missing("X-1-A-G"))
@@ -0,0 +1,128 @@
+import gzip
+import json
+import os
+import random
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from data.import_script.vcf_utils import (
+    clinvar_accession,
+    default_vcf_info_map,
+    estimate_vcf_records,
+    load_vcf_info_map,
+    readVCF,
+    record_to_rows,
+)
+
+HEADER = "##fileformat=VCFv4.2\n#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n"
+MULTIALLELIC = "chr22\t10510356\trs1423921207\tT\tA,G,*\t23\tPASS\tAF=0.16,0.2,0.01;AC=2,3,1;AN=12;nhomalt=4,1,0;gnomad_AF=0.8;CLINVAR_VCV=VCV000012345.3,VCV000000007,."
+
+
+def fields(line):
+    return line.split("\t")
+
+
+class RecordToRowsTests(SimpleTestCase):
+    def test_splits_alts_and_per_allele_info(self):
+        rows = record_to_rows(fields(MULTIALLELIC), default_vcf_info_map)
+        # the spanning deletion (*) has no row
+        self.assertEqual([row["variant_id"] for row in rows["variants"]], ["22-10510356-T-A", "22-10510356-T-G"])
+        self.assertEqual([row["variant"] for row in rows["snvs"]], ["22-10510356-T-A", "22-10510356-T-G"])
+        variome = rows["genomic_variome_frequencies"]
+        self.assertEqual([row["af_tot"] for row in variome], [0.16, 0.2])
+        self.assertEqual([row["ac_tot"] for row in variome], [2, 3])
+        # a field with one value is the same for every alt
+        self.assertEqual([row["an_tot"] for row in variome], [12, 12])
+        self.assertEqual([row["af_tot"] for row in rows["genomic_gnomad_frequencies"]], [0.8, 0.8])
+
+    def test_snv_columns(self):
+        snv = record_to_rows(fields(MULTIALLELIC), default_vcf_info_map)["snvs"][0]
+        self.assertEqual((snv["chr"], snv["pos"], snv["ref"], snv["alt"], snv["type"]), ("22", 10510356, "T", "A", "SNP"))
+        self.assertEqual(snv["dbsnp_id"], "rs1423921207")
+        self.assertTrue(snv["dbsnp_url"].endswith("rs=1423921207"))
+
+    def test_no_frequency_row_without_its_info_fields(self):
+        line = "22\t100\t.\tA\tAT\t.\t.\tAF=0.5"
+        rows = record_to_rows(fields(line), default_vcf_info_map)
+        self.assertEqual(rows["snvs"][0]["type"], "INDEL")
+        self.assertEqual(len(rows["genomic_variome_frequencies"]), 1)
+        self.assertEqual(rows["genomic_gnomad_frequencies"], [])
+
+
+class ClinvarAccessionTests(SimpleTestCase):
+    def test_accessions(self):
+        self.assertEqual(clinvar_accession("VCV000012345.3"), 12345)
+        self.assertEqual(clinvar_accession("vcv000000007"), 7)
+        self.assertEqual(clinvar_accession("VCV000000001|VCV000000002"), 1)
+        self.assertEqual(clinvar_accession(12345), 12345)
+        self.assertIsNone(clinvar_accession(None))
+        self.assertIsNone(clinvar_accession("not-an-accession"))
+
+    def test_per_alt_accessions(self):
+        rows = record_to_rows(fields(MULTIALLELIC), default_vcf_info_map)
+        self.assertEqual([row["clinvar_vcv"] for row in rows["snvs"]], [12345, 7])
+
+
+class VCFInfoMapTests(SimpleTestCase):
+    def test_default(self):
+        with mock.patch.dict(os.environ, {"VCF_INFO_MAP": ""}):
+            self.assertIs(load_vcf_info_map(), default_vcf_info_map)
+
+    def test_override(self):
+        info_map = {
+            "variants": {},
+            "snvs": {"cadd_score": "INFO:MY_CADD"},
+            "genomic_variome_frequencies": {"af_tot": "INFO:MY_AF"},
+            "genomic_gnomad_frequencies": {},
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump(info_map, f)
+        self.addCleanup(os.remove, f.name)
+        with mock.patch.dict(os.environ, {"VCF_INFO_MAP": f.name}):
+            loaded = load_vcf_info_map()
+        self.assertEqual(loaded, info_map)
+
+        rows = record_to_rows(fields("22\t100\t.\tA\tG\t.\t.\tMY_CADD=21.5;MY_AF=0.25;AF=0.9"), loaded)
+        self.assertEqual(rows["snvs"][0]["cadd_score"], 21.5)
+        self.assertEqual(rows["genomic_variome_frequencies"], [{"variant": "22-100-A-G", "af_tot": 0.25}])
+        self.assertEqual(rows["genomic_gnomad_frequencies"], [])
+
+
+class ReadVCFTests(SimpleTestCase):
+    def write_vcf(self, name, records):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, name)
+        rng = random.Random(0)
+        lines = HEADER + "".join(
+            "22\t" + str(1000 + i) + "\t.\tA\tG\t50\tPASS\tAF=" + format(rng.random(), ".5f") + ";AC=1;AN=8\n" for i in range(records)
+        )
+        opener = gzip.open if name.endswith((".gz", ".bgz")) else open
+        with opener(path, "wt") as f:
+            f.write(lines)
+        return path
+
+    def test_gzip_input_in_chunks(self):
+        path = self.write_vcf("test.vcf.gz", 25)
+        chunks = list(readVCF(path, default_vcf_info_map, 10))
+        self.assertEqual([num_records for num_records, dfs, estimate in chunks], [10, 10, 5])
+        self.assertEqual(sum(len(dfs["variants"]) for num_records, dfs, estimate in chunks), 25)
+        self.assertEqual(chunks[0][1]["variants"]["variant_id"].iloc[0], "22-1000-A-G")
+        # the last chunk knows the file's record count
+        self.assertEqual(chunks[-1][2], 25)
+
+    def test_plain_and_bgzip_read_alike(self):
+        plain = list(readVCF(self.write_vcf("test.vcf", 3), default_vcf_info_map, 10))
+        bgzip = list(readVCF(self.write_vcf("test.vcf.bgz", 3), default_vcf_info_map, 10))
+        self.assertTrue(plain[0][1]["snvs"].equals(bgzip[0][1]["snvs"]))
+
+    def test_estimate_of_a_small_file_is_exact(self):
+        self.assertEqual(estimate_vcf_records(self.write_vcf("test.vcf.gz", 42)), 42)
+        self.assertEqual(estimate_vcf_records(self.write_vcf("test.vcf", 42)), 42)
+
+    def test_estimate_of_a_large_file(self):
+        path = self.write_vcf("test.vcf.gz", 100000)
+        estimate = estimate_vcf_records(path, sample_bytes=64 * 1024)
+        self.assertLess(abs(estimate - 100000), 10000)
@@ -14,15 +14,36 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from . import views
 
+if settings.ASYNC_VIEWS:
+    variant_details = views.variant_details_async
+    snv_metadata = views.snv_metadata_async
+    snv_annotations = views.snv_annotations_async
+    genomic_population_frequencies = views.genomic_population_frequencies_async
+else:
+    variant_details = views.variant_details
+    snv_metadata = views.snv_metadata
+    snv_annotations = views.snv_annotations
+    genomic_population_frequencies = views.genomic_population_frequencies
+
 api_urls = [
-    path('snv/<str:variant_id>', views.snv_metadata, name='snv_metadata'),
-    path('annotations/<str:variant_id>', views.snv_annotations, name='snv_annotations'),
-    path('genomic_population_frequencies/<str:variant_id>', views.genomic_population_frequencies, name='genomic_population_frequencies'),
+    path('variant/<str:variant_id>', variant_details, name='variant_details'),
+    path('variants/batch', views.variant_batch, name='variant_batch'),
+    path('exists', views.variants_exist, name='variants_exist'),
+    path('region/<str:region>', views.region_variants, name='region_variants'),
+    path('variants', views.variant_browser, name='variant_browser'),
+    path('export', views.export_variants, name='export_variants'),
+    path('gene/<str:symbol>', views.gene_summary, name='gene_summary'),
+    path('snv/<str:variant_id>', snv_metadata, name='snv_metadata'),
+    path('annotations/<str:variant_id>', snv_annotations, name='snv_annotations'),
+    path('genomic_population_frequencies/<str:variant_id>', genomic_population_frequencies, name='genomic_population_frequencies'),
     path('search', views.snv_search, name='search'),
+    path('import_progress', views.import_progress, name='import_progress'),
+    path('cache_stats', views.cache_stats, name='cache_stats'),
     path('csrf/', views.get_csrf, name='api-csrf'),
     path('login/', views.login_view, name='api-login'),
     path('logout/', views.logout_view, name='api-logout'),
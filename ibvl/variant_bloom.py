@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+
+from ibvl.response_cache import dataset_generation
+
+# a bloom filter of every variant_id, written by the importer (data/import_script/variant_bloom.py) once the
+# dataset generation is bumped, and memory-mapped by each worker: the page cache holds one copy for all of them.
+# "not in the filter" is a definite miss, so lookups of variants outside the cohort skip the database.
+# a filter is only trusted while its generation is the current one, so an import never makes a new variant 404.
+# the importer writes VARIANT_FILTER_PATH on its own host: api hosts only use a filter they can read at that path
+
+HEADER = struct.Struct("<4sQIQQ")
+MAGIC = b"VBLM"
+MASK64 = (1 << 64) - 1
+
+logger = logging.getLogger(__name__)
+
+_state = {"filter": None, "checked_at": None, "warned": False}
+_state_lock = threading.Lock()
+
+
+def hashes(variant_id):
+    """ the two 64 bit hashes the filter's k bit positions are derived from (double hashing) """
+    digest = hashlib.blake2b(variant_id.encode(), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+def filter_size(count, false_positive_rate):
+    """ (bits, hashes) for count ids at the given false positive rate """
+    count = max(count, 1)
+    num_bits = max(64, math.ceil(-count * math.log(false_positive_rate) / (math.log(2) ** 2)))
+    num_hashes = max(1, round(num_bits / count * math.log(2)))
+    return num_bits, num_hashes
+
+
+class VariantBloomFilter:
+    """ a filter file, memory-mapped read only """
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.num_bits, self.num_hashes, self.generation, self.count = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or len(self.map) < HEADER.size + (self.num_bits + 7) // 8:
+            self.map.close()
+            raise ValueError(str(path) + " is not a variant filter")
+
+    def might_contain(self, variant_id):
+        h1, h2 = hashes(variant_id)
+        for i in range(self.num_hashes):
+            position = ((h1 + i * h2) & MASK64) % self.num_bits
+            if not self.map[HEADER.size + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+
+def current_filter():
+    """
+    the filter for the current dataset generation, None if there isn't one (not built yet, or not rebuilt
+    since the last import). a missing or stale file is looked for again every RESPONSE_CACHE_GENERATION_TTL seconds
+    """
+    if settings.VARIANT_FILTER_PATH is None:
+        return None
+    generation = dataset_generation()
+    loaded = _state["filter"]
+    if loaded is not None and loaded.generation == generation:
+        return loaded
+    now = time.monotonic()
+    if _state["checked_at"] is not None and now - _state["checked_at"] <= settings.RESPONSE_CACHE_GENERATION_TTL:
+        return None
+    with _state_lock:
+        _state["checked_at"] = now
+        try:
+            loaded = VariantBloomFilter(settings.VARIANT_FILTER_PATH)
+        except (OSError, ValueError, struct.error) as e:
+            if not _state["warned"]:
+                # once per worker: without the file every lookup goes to the database, which works, just slower
+                logger.warning(
+                    "no variant filter at VARIANT_FILTER_PATH (%s), lookups will all query the database. "
+                    "it has to be on storage shared with the importer, or set VARIANT_FILTER_PATH=none: %s",
+                    settings.VARIANT_FILTER_PATH, e,
+                )
+                _state["warned"] = True
+            return None
+        # the old map stays valid for requests still using it, and is unmapped once they drop it
+        _state["filter"] = loaded
+    return loaded if loaded.generation == generation else None
+
+
+def definitely_missing(variant_id):
+    """ True when variant_id is certainly not in the database, False when it may be """
+    bloom = current_filter()
+    return bloom is not None and not bloom.might_contain(variant_id)
+
+
+def maybe_present(variant_ids):
+    """ the variant_ids that may be in the database, in order """
+    bloom = current_filter()
+    if bloom is None:
+        return list(variant_ids)
+    return [variant_id for variant_id in variant_ids if bloom.might_contain(variant_id)]
+
+
+def write_filter(path, variant_ids, count, generation, false_positive_rate):
+    """
+    writes a filter of variant_ids (an iterable of lists of them, count in all) to path. it's written next to it
+    and renamed over it, so workers mapping the old file keep reading it intact
+    """
+    import numpy as np
+
+    num_bits, num_hashes = filter_size(count, false_positive_rate)
+    bits = np.zeros((num_bits + 7) // 8, dtype=np.uint8)
+    steps = np.arange(num_hashes, dtype=np.uint64)
+    for chunk in variant_ids:
+        if len(chunk) == 0:
+            continue
+        pairs = np.array([hashes(variant_id) for variant_id in chunk], dtype=np.uint64)
+        # uint64 arithmetic wraps like the & MASK64 in might_contain
+        positions = (pairs[:, :1] + steps * pairs[:, 1:]) % np.uint64(num_bits)
+        positions = positions.ravel()
+        np.bitwise_or.at(bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+
+    temporary_path = str(path) + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, num_bits, num_hashes, generation, count))
+        file.write(bits.tobytes())
+    os.replace(temporary_path, path)
+    return num_bits, num_hashes
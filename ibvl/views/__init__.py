@@ -2,6 +2,16 @@
 from .snv_metadata import snv_metadata
 from .snv_annotations import snv_annotations
 from .genomic_population_frequencies import genomic_population_frequencies
+from .variant import variant_details
+from .variant_batch import variant_batch
+from .variant_exists import variants_exist
+from .variant_async import variant_details_async, snv_metadata_async, genomic_population_frequencies_async, snv_annotations_async
+from .region import region_variants
+from .variant_browser import variant_browser
+from .export import export_variants
+from .gene import gene_summary
 from .search import snv_search
+from .import_progress import import_progress
+from .cache_stats import cache_stats
 from .authentication import *
 from .profile_view import profile_view, profile_view_stub
\ No newline at end of file
@@ -0,0 +1,12 @@
+from ibvl.response_cache import cache_stats as get_cache_stats
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request, **kwargs):
+    """ response cache hit/miss counters for this worker and across all workers, and the dataset generation """
+
+    return Response(get_cache_stats())
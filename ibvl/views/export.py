@@ -0,0 +1,102 @@
+import csv
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router
+from django.http import StreamingHttpResponse
+from ibvl.models import (
+    SNV,
+    VariantTranscript,
+    VariantGeneSeverity,
+)
+from .region import parse_region
+from .variant_filters import consequence_filters
+from .variant_rows import EXPORT_COLUMNS
+
+from ibvl.arrow import ARROW_MEDIA_TYPE, pyarrow, streaming_arrow_response, wants_arrow
+
+from django.http.response import JsonResponse
+from django.views.decorators.http import require_GET
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "tsv": "text/tab-separated-values",
+    "arrow": ARROW_MEDIA_TYPE,
+}
+
+
+class Echo:
+    """ file-like object for csv.writer that hands back each line instead of buffering it """
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(rows):
+    names = list(EXPORT_COLUMNS.keys())
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def tsv_lines(rows):
+    writer = csv.writer(Echo(), delimiter="\t", lineterminator="\n")
+    yield writer.writerow(EXPORT_COLUMNS.keys())
+    for row in rows:
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+# a plain django view: DRF would treat ?format= as a renderer choice
+@require_GET
+def export_variants(request):
+    """
+    streams every snv of a gene (?gene=) or region (?region=22:10500000-10600000) with its frequencies,
+    as ndjson (default), tsv (?format=tsv) or an arrow ipc stream (?format=arrow, or an arrow Accept header). rows are read through a server-side cursor, so memory use
+    doesn't grow with the export. ?worst_consequence= / ?worst_consequence_at_most= narrow it by consequence,
+    within the gene's transcripts for gene exports
+    """
+
+    export_format = request.GET.get("format", "arrow" if wants_arrow(request) else "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({"errors": ["format must be one of " + ", ".join(EXPORT_FORMATS.keys())]}, status=400)
+    if export_format == "arrow" and pyarrow is None:
+        return JsonResponse({"errors": ["arrow output needs pyarrow installed on the server"]}, status=406)
+
+    gene = request.GET.get("gene")
+    region = request.GET.get("region")
+    if gene:
+        # consequences are judged within this gene's transcripts, off the (gene, severity_number) index
+        filters, errors = consequence_filters(request.GET, "consequence", "severity_number")
+        if len(errors) > 0:
+            return JsonResponse({"errors": errors}, status=400)
+        if len(filters) > 0:
+            variants = VariantGeneSeverity.objects.filter(gene__short_name=gene.upper(), **filters).values("variant")
+        else:
+            variants = VariantTranscript.objects.filter(transcript__gene__short_name=gene.upper()).values("variant")
+        queryset = SNV.objects.filter(variant__in=variants)
+        filename = gene.upper()
+    elif region:
+        parsed = parse_region(region)
+        if parsed is None:
+            return JsonResponse({"errors": ["region must look like 22:10500000-10600000"]}, status=400)
+        chr, start, end = parsed
+        filters, errors = consequence_filters(request.GET, "variant__worst_consequence", "variant__worst_severity")
+        if len(errors) > 0:
+            return JsonResponse({"errors": errors}, status=400)
+        queryset = SNV.objects.filter(chr=chr, pos__gte=start, pos__lte=end, **filters)
+        filename = chr + "_" + str(start) + "-" + str(end)
+    else:
+        return JsonResponse({"errors": ["pass a gene or region parameter"]}, status=400)
+
+    # the rows are read after this view returns, when the replica routing of the request is over: pick the database now
+    rows = (
+        queryset.using(router.db_for_read(SNV))
+        .order_by("chr", "pos", "id")
+        .values_list(*EXPORT_COLUMNS.values())
+        .iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    )
+    if export_format == "arrow":
+        response = streaming_arrow_response(SNV, EXPORT_COLUMNS, rows)
+    else:
+        lines = ndjson_lines(rows) if export_format == "ndjson" else tsv_lines(rows)
+        response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+    response["Content-Disposition"] = 'attachment; filename="variome_' + filename + "." + export_format + '"'
+    return response
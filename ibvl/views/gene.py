@@ -0,0 +1,28 @@
+from ibvl.models import (
+    GeneSummary
+)
+from ibvl.serializers import (
+    GeneSummarySerializer
+)
+
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from django.http.response import JsonResponse
+
+@api_view(['GET'])
+def gene_summary(request, symbol, **kwargs):
+    """ variant counts of a gene by consequence, impact and frequency bin, precomputed at import """
+
+    json = kwargs.get('JSON', False)
+
+    summary = GeneSummary.objects.filter(short_name=symbol.upper()).first()
+    if summary is None:
+        return JsonResponse({"errors": ["gene not found"]}, status=404)
+
+    data_out = {"gene": GeneSummarySerializer(summary).data, "errors": []}
+
+    if json:
+        return JsonResponse(data_out)
+    else:
+        return Response(data_out)
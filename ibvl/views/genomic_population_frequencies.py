@@ -5,46 +5,56 @@ from ibvl.models import (
     GenomicVariomeFrequency
 )
 from ibvl.serializers import (
-    GenomicGnomadFrequencySerializer,
-    GenomicVariomeFrequencySerializer
+    gnomad_frequency_rows,
+    variome_frequency_rows
 )
+from .variant_rows import first_for_variant, requested_fields, sparse_rows
 
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
+from ibvl.variant_bloom import definitely_missing
+
+from ibvl.fast_json import VARIANT_RENDERERS, api_response
+from ibvl.response_cache import cached_response
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 
 from django.http import Http404
 from django.http.response import JsonResponse
 
 @api_view(['GET'])
+@renderer_classes(VARIANT_RENDERERS)
+@cached_response('genomic_population_frequencies')
 def genomic_population_frequencies(request, variant_id, **kwargs):
     """
+    ?fields=af_tot,ac_tot limits both frequencies to those fields; a table with none of them isn't queried
     """
 
     json = kwargs.get('JSON', False)
 
     data_out = {}
-    try:
-        # Get all relevant information from the database 
-        errors = []
-        variant = Variant.objects.get(variant_id=variant_id)
-    except Variant.DoesNotExist:
+    names, errors = requested_fields(request.GET.get("fields"))
+    (gnomad_rows, variome_rows), field_errors = sparse_rows(names, gnomad_frequency_rows, variome_frequency_rows)
+    errors.extend(field_errors)
+    if len(errors) > 0:
+        return JsonResponse({"errors": errors}, status=400)
+    if definitely_missing(variant_id):
+        return JsonResponse({"errors": ["variant_id not found"]}, status=404)
+
+    gen_gnomad_freq = first_for_variant(GenomicGnomadFrequency, gnomad_rows, variant_id) if gnomad_rows is not None else None
+    gen_ibvl_freq = first_for_variant(GenomicVariomeFrequency, variome_rows, variant_id) if variome_rows is not None else None
+    # a frequency row is proof enough the variant exists
+    if gen_gnomad_freq is None and gen_ibvl_freq is None and not Variant.objects.filter(variant_id=variant_id).exists():
         errors.append("variant_id not found")
         return JsonResponse({"errors":errors}, status=404)
-    
-    try:
-        gen_gnomad_freq = GenomicGnomadFrequency.objects.get(variant_id=variant.id)
-        data_out["genomic_gnomad_freq"] = GenomicGnomadFrequencySerializer(gen_gnomad_freq).data
-    except GenomicGnomadFrequency.DoesNotExist:
+
+    if gen_gnomad_freq is not None:
+        data_out["genomic_gnomad_freq"] = gen_gnomad_freq
+    elif gnomad_rows is not None:
         errors.append("genomic gnomad frequency not found for this variant")
-#        return JsonResponse({"errors":["genomic gnomad frequency not found for this variant"]}, status=404)
-    
-    try:
-        gen_ibvl_freq = GenomicVariomeFrequency.objects.get(variant_id=variant.id)
-        data_out["genomic_ibvl_freq"] = GenomicVariomeFrequencySerializer(gen_ibvl_freq).data
-    except GenomicVariomeFrequency.DoesNotExist:
+
+    if gen_ibvl_freq is not None:
+        data_out["genomic_ibvl_freq"] = gen_ibvl_freq
+    elif variome_rows is not None:
         errors.append("genomic variome frequency not found for this variant")
-#        return JsonResponse({"errors":["genomic variome frequency not found for this variant"]}, status=404)
 
     if request.method == 'GET':
         data_out["errors"] = errors
@@ -53,4 +63,4 @@ def genomic_population_frequencies(request, variant_id, **kwargs):
         if json:
             return JsonResponse(data_out)
         else:
-            return Response(data_out)
\ No newline at end of file
+            return api_response(request, data_out)
\ No newline at end of file
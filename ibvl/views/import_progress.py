@@ -0,0 +1,30 @@
+from ibvl.models import (
+    ImportProgress
+)
+from ibvl.serializers import (
+    ImportProgressSerializer
+)
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from django.http.response import JsonResponse
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def import_progress(request, **kwargs):
+    """ progress of the latest import_ibvl run, as published by the importer """
+
+    json = kwargs.get('JSON', False)
+
+    progress = ImportProgress.objects.order_by('-id').first()
+    if progress is None:
+        data_out = {"progress": None, "errors": ["no import has been recorded"]}
+    else:
+        data_out = {"progress": ImportProgressSerializer(progress).data, "errors": []}
+
+    if json:
+        return JsonResponse(data_out)
+    else:
+        return Response(data_out)
@@ -0,0 +1,99 @@
+import re
+from django.conf import settings
+from django.db.models import Q
+from ibvl.models import (
+    SNV,
+)
+
+from .variant_filters import consequence_filters
+from .variant_rows import EXPORT_COLUMNS, serialize_with_worst, snv_results
+
+from ibvl.arrow import ARROW_RENDERERS, arrow_response, wants_arrow
+from ibvl.fast_json import VARIANT_RENDERERS, api_response
+from rest_framework.decorators import api_view, renderer_classes
+
+from django.http.response import JsonResponse
+
+REGION_RE = re.compile(r"^(chr)?([0-9]{1,2}|X|Y|M|MT):([0-9,]+)-([0-9,]+)$", re.IGNORECASE)
+CURSOR_RE = re.compile(r"^([0-9]+):([0-9]+)$")
+
+
+def parse_region(region):
+    """ "22:10,500,000-10,600,000" or "chr22:..." -> ("22", 10500000, 10600000), None if it doesn't parse """
+    match = REGION_RE.match(region.strip())
+    if match is None:
+        return None
+    chr = match.group(2).upper()
+    start = int(match.group(3).replace(",", ""))
+    end = int(match.group(4).replace(",", ""))
+    return chr, start, end
+
+
+@api_view(['GET'])
+@renderer_classes(VARIANT_RENDERERS + ARROW_RENDERERS)
+def region_variants(request, region, **kwargs):
+    """
+    snvs in a genomic region with their population frequencies, ordered by position.
+    pages are keyset paginated: pass the "next" value of a page as ?after= to get the following one.
+    ?worst_consequence= and ?worst_consequence_at_most= narrow it by the variants' most severe consequence,
+    which each result carries as worst_consequence and worst_impact.
+    with an arrow Accept header the page comes as an arrow stream of EXPORT_COLUMNS rows, "next" in its schema metadata
+    """
+
+    json = kwargs.get('JSON', False)
+
+    parsed = parse_region(region)
+    if parsed is None:
+        return JsonResponse({"errors": ["region must look like 22:10500000-10600000"]}, status=400)
+    chr, start, end = parsed
+    if end < start:
+        return JsonResponse({"errors": ["region end is before its start"]}, status=400)
+
+    try:
+        limit = int(request.GET.get("limit", settings.REGION_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"errors": ["limit must be a number"]}, status=400)
+    limit = max(1, min(limit, settings.REGION_MAX_ROWS))
+
+    filters, errors = consequence_filters(request.GET, "variant__worst_consequence", "variant__worst_severity")
+    if len(errors) > 0:
+        return JsonResponse({"errors": errors}, status=400)
+
+    queryset = SNV.objects.filter(chr=chr, pos__gte=start, pos__lte=end, **filters)
+    after = request.GET.get("after")
+    if after:
+        cursor = CURSOR_RE.match(after)
+        if cursor is None:
+            return JsonResponse({"errors": ["after must be the next value of a previous page"]}, status=400)
+        after_pos, after_id = int(cursor.group(1)), int(cursor.group(2))
+        # pos__gte narrows the index range, the OR only has to settle ties at after_pos
+        queryset = queryset.filter(pos__gte=after_pos).filter(Q(pos__gt=after_pos) | Q(pos=after_pos, id__gt=after_id))
+
+    if wants_arrow(request):
+        rows = list(queryset.order_by('pos', 'id').values_list('pos', 'id', *EXPORT_COLUMNS.values())[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = str(rows[-1][0]) + ":" + str(rows[-1][1])
+        return arrow_response(SNV, EXPORT_COLUMNS, [row[2:] for row in rows], {"next": next_cursor or ""})
+
+    # one row past the page tells us whether there is a next one
+    snvs, worst = serialize_with_worst(queryset.order_by('pos', 'id')[:limit + 1])
+    next_cursor = None
+    if len(snvs) > limit:
+        snvs = snvs[:limit]
+        next_cursor = str(snvs[-1]["pos"]) + ":" + str(snvs[-1]["id"])
+
+    variants = snv_results(snvs, worst)
+
+    data_out = {
+        "region": {"chr": chr, "start": start, "end": end},
+        "variants": variants,
+        "next": next_cursor,
+        "errors": [],
+    }
+
+    if json:
+        return JsonResponse(data_out)
+    else:
+        return api_response(request, data_out)
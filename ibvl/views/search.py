@@ -1,7 +1,9 @@
 import json
 from rest_framework import viewsets
+import re
 from ibvl.models import (
     Variant,
+    SearchTerm,
 )
 from ibvl.serializers import (
     VariantSerializer,
@@ -11,38 +13,105 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 
+from django.db.models.functions import Collate
 from django.http import Http404
 from django.http.response import JsonResponse
 
+# Only send at most 10 variants
+SEARCH_RESULTS_LIMIT = 10
+# search terms read before ranking, so a short prefix can't make the query walk the whole index
+SEARCH_CANDIDATES = 50
+# suggestions referring to more variants than this leave variant_ids empty, the client follows up by term
+VARIANTS_PER_SUGGESTION = 5
+
+VARIANT_ID_RE = re.compile(r"^(CHR)?([0-9]{1,2}|X|Y|M|MT)-[0-9]")
+RSID_RE = re.compile(r"^RS[0-9]*$")
+HGVSC_RE = re.compile(r"(^|:)[CNGM]\.")
+HGVSP_RE = re.compile(r"(^|:)P\.")
+TRANSCRIPT_RE = re.compile(r"^(ENST|NM_|NR_|XM_|XR_)")
+
+
+def search_types(query):
+    """ the search term types a query could be, most likely first """
+    if VARIANT_ID_RE.match(query):
+        return []
+    if RSID_RE.match(query):
+        return ["rsid", "gene"]
+    if HGVSP_RE.search(query):
+        return ["hgvsp"]
+    if HGVSC_RE.search(query):
+        return ["hgvsc"]
+    if TRANSCRIPT_RE.match(query):
+        return ["hgvsc", "hgvsp"]
+    return ["gene", "rsid", "hgvsc", "hgvsp"]
+
+
+def term_suggestions(query, types):
+    terms = list(
+        SearchTerm.objects.annotate(key_c=Collate('key', 'C'))
+        .filter(key_c__startswith=query, term_type__in=types)
+        .order_by('key_c')
+        .values('id', 'term_type', 'term', 'key', 'variant_count')[:SEARCH_CANDIDATES]
+    )
+    # exact matches first, then the more likely type, then the more common term
+    terms.sort(key=lambda term: (term['key'] != query, types.index(term['term_type']), -term['variant_count'], term['key']))
+    terms = terms[:SEARCH_RESULTS_LIMIT]
+
+    variant_ids = {}
+    few_variants = [term['id'] for term in terms if 0 < term['variant_count'] <= VARIANTS_PER_SUGGESTION]
+    if len(few_variants) > 0:
+        links = SearchTerm.variants.through.objects.filter(searchterm_id__in=few_variants) \
+            .order_by('variant__variant_id').values_list('searchterm_id', 'variant__variant_id')
+        for term_id, variant_id in links:
+            variant_ids.setdefault(term_id, []).append(variant_id)
+
+    return [{
+        "type": term['term_type'],
+        "term": term['term'],
+        "variant_count": term['variant_count'],
+        "variant_ids": variant_ids.get(term['id'], []),
+    } for term in terms]
+
 @api_view(['GET'])
 def snv_search(request, **kwargs):
     """
     """
     json_content = kwargs.get('JSON', False)
     query_params = request.query_params
-    if 'variant_id' in query_params:
+    if 'q' in query_params:
+        variant_id = query_params['q']
+    elif 'variant_id' in query_params:
         variant_id = query_params['variant_id']
     else:
-        return Response({"errors":["missing variant_id parameter"]})
+        return Response({"errors":["missing q or variant_id parameter"]})
+    variant_id = variant_id.strip()
 #    variant_id = json.loads(request.body)["variant_id"]
 
-    try:
-        # Get all relevant information from the database 
-        #variant = Variant.objects.get(variant_id=variant_id)
-        variants = Variant.objects.filter(variant_id__startswith=variant_id).values_list('variant_id', flat=True)
-    except Variant.DoesNotExist:
-        variants = None
+    # filter and order on the "C" collated variant_id so postgres walks the
+    # variants_variant_id_c_idx index and stops after the LIMIT
+    variants = (
+        Variant.objects.annotate(variant_id_c=Collate('variant_id', 'C'))
+        .filter(variant_id_c__startswith=variant_id)
+        .order_by('variant_id_c')
+        .values_list('variant_id', flat=True)[:SEARCH_RESULTS_LIMIT]
+    )
 
     if request.method == 'GET':
-        if variants:
-            # Only send at most 10 variants
-            data_out = {
-                "variants": list(variants)[:10],
-            }
-        else:
-            data_out = {
-                "variants": [],
-            }
+        variants = list(variants)
+        suggestions = [{
+            "type": "variant",
+            "term": variant,
+            "variant_count": 1,
+            "variant_ids": [variant],
+        } for variant in variants]
+        types = search_types(variant_id.upper())
+        if len(variant_id) > 0 and len(types) > 0:
+            suggestions += term_suggestions(variant_id.upper(), types)
+
+        data_out = {
+            "variants": variants,
+            "suggestions": suggestions[:SEARCH_RESULTS_LIMIT],
+        }
 
         if json_content:
             return JsonResponse(data_out)
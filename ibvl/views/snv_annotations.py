@@ -6,6 +6,7 @@ from ibvl.models import (
     VariantTranscript,
     VariantAnnotation,
     VariantConsequence,
+    VariantAnnotationDocument,
 )
 from ibvl.serializers import (
     VariantTranscriptSerializer,
@@ -13,6 +14,8 @@ from ibvl.serializers import (
     VariantAnnotationSerializer,
 )
 
+from ibvl.response_cache import cached_response
+from ibvl.variant_bloom import definitely_missing
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
@@ -21,80 +24,162 @@ from django.http import Http404
 from django.http.response import JsonResponse
 
 
-@api_view(["GET"])
-def snv_annotations(request, variant_id, **kwargs):
-    """ gets the annotations for a variant's transcripts, organized by gene name """
-    errors = []
-    transcripts_by_gene = []
-    database = request.GET.get(
-        "transcript_database", None
-    )  # E for Ensembl or R for Refseq
-    
+annotation_values_names = {
+    "transcript__gene__short_name": "gene",
+    "transcript__transcript_id": "transcript",
+    "consequence__severity__consequence": "consequence",
+    "annotation__impact": "impact",
+    "transcript__biotype": "biotype",
+    "transcript__transcript_type": "database",
+    "hgvsc": "hgvsc",
+    "annotation__hgvsp": "hgvsp",
+    "annotation__polyphen": "polyphen",
+    "annotation__sift": "sift",
+    "variant__snv__cadd_intr": "cadd intr",
+    "variant__snv__cadd_score": "cadd score",
+}
 
-    json = kwargs.get("JSON", False)
 
-    try:
+# orders the rows like the annotation documents, so both give consequences in the same order
+live_order = ("id", "annotation__id", "consequence__severity__severity_number")
+# read alongside annotation_values_names, to order a row's consequences by severity
+severity_key = "consequence__severity__severity_number"
 
-        values_names = {
-            "transcript__gene__short_name": "gene",
-            "transcript__transcript_id": "transcript",
-            "consequence__severity__consequence": "consequence",
-            "annotation__impact": "impact",
-            "transcript__biotype": "biotype",
-            "transcript__transcript_type": "database",
-            "hgvsc": "hgvsc",
-            "annotation__hgvsp": "hgvsp",
-            "annotation__polyphen": "polyphen",
-            "annotation__sift": "sift",
-            "variant__snv__cadd_intr": "cadd intr",
-            "variant__snv__cadd_score": "cadd score",
-        }
-        
-        if database is None or database not in ["E", "R"]:
-            transcripts = (
-                VariantTranscript.objects.filter(
-                    variant__variant_id=variant_id
-                )
-                .values(*values_names.keys())
-                .all()
-            )
-        else:
-            transcripts = (
-                VariantTranscript.objects.filter(
-                    variant__variant_id=variant_id, transcript__transcript_type=database
-                )
-                .values(*values_names.keys())
-                .all()
-            )
 
-        if len(transcripts) == 0:
-            raise VariantTranscript.DoesNotExist
+def group_by_gene(transcripts):
+    """
+    renames the values() keys, folds rows that differ only by consequence into one with a list of
+    distinct consequences ordered by severity, and groups the transcripts by gene, keeping the order genes first appear in
+    """
+    transcripts_by_gene = []
+    genes = {}
+    merged = {}
+    severities = {}
+    for transcript in transcripts:
+        t = {annotation_values_names[key]: value for key, value in transcript.items() if key in annotation_values_names}
+        row_key = tuple((key, value) for key, value in t.items() if key != "consequence")
+        consequence = t["consequence"]
+        if row_key not in merged:
+            t["consequence"] = []
+            merged[row_key] = t
+            severities[row_key] = {}
+            gene = t["gene"]
+            if gene not in genes:
+                genes[gene] = {"gene": gene, "transcripts": []}
+                transcripts_by_gene.append(genes[gene])
+            genes[gene]["transcripts"].append(t)
+        if consequence is not None and consequence not in severities[row_key]:
+            severities[row_key][consequence] = transcript.get(severity_key)
+    for row_key, t in merged.items():
+        t["consequence"] = sorted(severities[row_key], key=lambda consequence: severities[row_key][consequence])
+    return transcripts_by_gene
+
 
+def from_document(document, database=None):
+    """ an annotation document filtered to one transcript database, with keys back in annotation_values_names order (jsonb sorts them) """
+    transcripts_by_gene = []
+    for gene in document:
         transcripts = [
-            {values_names[key]: value for key, value in transcript.items()}
-            for transcript in transcripts
+            {name: transcript.get(name) for name in annotation_values_names.values()}
+            for transcript in gene["transcripts"]
+            if database not in ["E", "R"] or transcript["database"] == database
         ]
+        if len(transcripts) > 0:
+            transcripts_by_gene.append({"gene": gene["gene"], "transcripts": transcripts})
+    return transcripts_by_gene
 
-        for t in transcripts:
-            gene = t["gene"]
-            gene_exists = any(
-                gene == gene_dict["gene"] for gene_dict in transcripts_by_gene
-            )
-            if gene_exists:
-                for d in transcripts_by_gene:
-                    d["transcripts"].append(t) if d.get("gene") == gene else None
+
+def get_annotations(variant_id, database=None):
+    """ the annotations for a variant's transcripts, organized by gene name, and any errors """
+    errors = []
+    transcripts_by_gene = []
+
+    if definitely_missing(variant_id):
+        errors.append("No Transcripts were found for variant: " + variant_id)
+        return transcripts_by_gene, errors
+
+    try:
+        document = (
+            VariantAnnotationDocument.objects.filter(variant__variant_id=variant_id)
+            .values_list("annotations", flat=True)
+            .first()
+        )
+        if document is not None:
+            transcripts_by_gene = from_document(document, database)
+        else:
+            # no document: the variant has no transcripts, or the documents haven't been built since the import
+            if database is None or database not in ["E", "R"]:
+                transcripts = (
+                    VariantTranscript.objects.filter(
+                        variant__variant_id=variant_id
+                    )
+                    .order_by(*live_order)
+                    .values(*annotation_values_names.keys(), severity_key)
+                    .all()
+                )
             else:
-                transcripts_by_gene.append({"gene": gene, "transcripts": [t]})
+                transcripts = (
+                    VariantTranscript.objects.filter(
+                        variant__variant_id=variant_id, transcript__transcript_type=database
+                    )
+                    .order_by(*live_order)
+                    .values(*annotation_values_names.keys(), severity_key)
+                    .all()
+                )
+            transcripts_by_gene = group_by_gene(transcripts)
+
+        if len(transcripts_by_gene) == 0:
+            raise VariantTranscript.DoesNotExist
 
-    #        for transcript in transcripts:
-    #            print("transcript", transcript, "\n")
-    #        print("transcripts by gene", transcripts_by_gene)
     except Variant.DoesNotExist:
         errors.append("Variant ID was not found: " + variant_id)
 
     except VariantTranscript.DoesNotExist:
         errors.append("No Transcripts were found for variant: " + variant_id)
 
+    return transcripts_by_gene, errors
+
+
+def get_annotations_for_variants(variant_pks, database=None):
+    """ annotations organized by gene for many variants (by primary key), from their documents where they exist """
+    annotations = {}
+    documented = set()
+    documents = VariantAnnotationDocument.objects.filter(variant__in=variant_pks).values_list("variant", "annotations")
+    for variant_pk, document in documents:
+        documented.add(variant_pk)
+        transcripts_by_gene = from_document(document, database)
+        if len(transcripts_by_gene) > 0:
+            annotations[variant_pk] = transcripts_by_gene
+
+    missing = [variant_pk for variant_pk in variant_pks if variant_pk not in documented]
+    if len(missing) == 0:
+        return annotations
+    transcripts = VariantTranscript.objects.filter(variant__in=missing)
+    if database in ["E", "R"]:
+        transcripts = transcripts.filter(transcript__transcript_type=database)
+    transcripts = transcripts.order_by(*live_order).values("variant", *annotation_values_names.keys(), severity_key)
+
+    transcripts_by_variant = {}
+    for transcript in transcripts:
+        transcripts_by_variant.setdefault(transcript["variant"], []).append(transcript)
+    for variant_pk, variant_transcripts in transcripts_by_variant.items():
+        annotations[variant_pk] = group_by_gene(variant_transcripts)
+    return annotations
+
+
+@api_view(["GET"])
+@cached_response("snv_annotations")
+def snv_annotations(request, variant_id, **kwargs):
+    """ gets the annotations for a variant's transcripts, organized by gene name """
+    database = request.GET.get(
+        "transcript_database", None
+    )  # E for Ensembl or R for Refseq
+    
+
+    json = kwargs.get("JSON", False)
+
+    transcripts_by_gene, errors = get_annotations(variant_id, database)
+
     if request.method == "GET":
         data_out = {"annotations": transcripts_by_gene, "errors": errors}
 
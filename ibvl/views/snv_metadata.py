@@ -1,38 +1,46 @@
 from rest_framework import viewsets
 from ibvl.models import (
-    Variant,
     SNV
 )
 from ibvl.serializers import (
-    SNVSerializer
+    snv_rows
 )
+from .variant_rows import first_for_variant, requested_fields, sparse_rows
 
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
+from ibvl.variant_bloom import definitely_missing
+
+from ibvl.fast_json import VARIANT_RENDERERS, api_response
+from ibvl.response_cache import cached_response
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.authentication import SessionAuthentication, BasicAuthentication
 
 from django.http import Http404
 from django.http.response import JsonResponse
 
 @api_view(['GET'])
+@renderer_classes(VARIANT_RENDERERS)
+@cached_response('snv_metadata')
 def snv_metadata(request, variant_id, **kwargs):
     """
+    ?fields=cadd_score,variant.variant_id limits the snv to those fields, and the query to their columns
     """
 
     json = kwargs.get('JSON', False)
 
-    try:
-        variant = Variant.objects.get(variant_id=variant_id)
-        snv = SNV.objects.get(variant=variant)
-    except Variant.DoesNotExist:
+    names, errors = requested_fields(request.GET.get("fields"))
+    (rows,), field_errors = sparse_rows(names, snv_rows)
+    errors.extend(field_errors)
+    if len(errors) > 0:
+        return JsonResponse({"errors": errors}, status=400)
+    if definitely_missing(variant_id):
         raise Http404
-    except SNV.DoesNotExist:
+
+    snv = first_for_variant(SNV, rows, variant_id)
+    if snv is None:
         raise Http404
 
     if request.method == 'GET':
-        serializer = SNVSerializer(snv)
-
         if json:
-            return JsonResponse(serializer.data)
+            return JsonResponse(snv)
         else:
-            return Response(serializer.data)
\ No newline at end of file
+            return api_response(request, snv)
\ No newline at end of file
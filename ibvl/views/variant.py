@@ -0,0 +1,83 @@
+from ibvl.models import (
+    Variant,
+    SNV,
+    GenomicGnomadFrequency,
+    GenomicVariomeFrequency
+)
+from ibvl.serializers import (
+    snv_rows,
+    gnomad_frequency_rows,
+    variome_frequency_rows
+)
+from .snv_annotations import get_annotations
+from .variant_rows import first_for_variant, requested_fields, sparse_rows
+
+from ibvl.variant_bloom import definitely_missing
+
+from ibvl.fast_json import VARIANT_RENDERERS, api_response
+from ibvl.response_cache import cached_response
+from rest_framework.decorators import api_view, renderer_classes
+
+from django.http.response import JsonResponse
+
+@api_view(['GET'])
+@renderer_classes(VARIANT_RENDERERS)
+@cached_response('variant_details')
+def variant_details(request, variant_id, **kwargs):
+    """
+    snv metadata, genomic population frequencies and annotations of a variant in one response.
+    four queries for a variant that has an snv or frequencies: those three rows and the annotations.
+    ?fields=cadd_score,af_tot limits the snv and frequencies to those fields, leaving out (and not querying)
+    the ones that have none of them
+    """
+
+    json = kwargs.get('JSON', False)
+    database = request.GET.get(
+        "transcript_database", None
+    )  # E for Ensembl or R for Refseq
+
+    names, errors = requested_fields(request.GET.get("fields"))
+    (rows, gnomad_rows, variome_rows), field_errors = sparse_rows(names, snv_rows, gnomad_frequency_rows, variome_frequency_rows)
+    errors.extend(field_errors)
+    if len(errors) > 0:
+        return JsonResponse({"errors": errors}, status=400)
+    if definitely_missing(variant_id):
+        return JsonResponse({"errors": ["variant_id not found"]}, status=404)
+
+    snv = first_for_variant(SNV, rows, variant_id) if rows is not None else None
+    gnomad_freq = first_for_variant(GenomicGnomadFrequency, gnomad_rows, variant_id) if gnomad_rows is not None else None
+    variome_freq = first_for_variant(GenomicVariomeFrequency, variome_rows, variant_id) if variome_rows is not None else None
+    if snv is None and gnomad_freq is None and variome_freq is None \
+            and not Variant.objects.filter(variant_id=variant_id).exists():
+        return JsonResponse({"errors": ["variant_id not found"]}, status=404)
+
+    data_out = {}
+
+    if snv is not None:
+        data_out["snv"] = snv
+    elif rows is not None:
+        data_out["snv"] = None
+        errors.append("snv not found for this variant")
+
+    frequencies = {}
+    if gnomad_freq is not None:
+        frequencies["genomic_gnomad_freq"] = gnomad_freq
+    elif gnomad_rows is not None:
+        errors.append("genomic gnomad frequency not found for this variant")
+    if variome_freq is not None:
+        frequencies["genomic_ibvl_freq"] = variome_freq
+    elif variome_rows is not None:
+        errors.append("genomic variome frequency not found for this variant")
+    data_out["frequencies"] = frequencies
+
+    annotations, annotation_errors = get_annotations(variant_id, database)
+    data_out["annotations"] = annotations
+    errors.extend(annotation_errors)
+
+    if request.method == 'GET':
+        data_out["errors"] = errors
+
+        if json:
+            return JsonResponse(data_out)
+        else:
+            return api_response(request, data_out)
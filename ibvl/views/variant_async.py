@@ -0,0 +1,155 @@
+import asyncio
+from ibvl.models import (
+    Variant,
+    SNV,
+    GenomicGnomadFrequency,
+    GenomicVariomeFrequency
+)
+from ibvl.serializers import (
+    snv_rows,
+    gnomad_frequency_rows,
+    variome_frequency_rows
+)
+from .snv_annotations import get_annotations
+from .variant_rows import first_for_variant, requested_fields, sparse_rows
+
+from ibvl.async_queries import run_query
+from ibvl.fast_json import PrerenderedJSONResponse
+from ibvl.response_cache import cached_response
+from ibvl.variant_bloom import definitely_missing
+
+from django.http import HttpResponseNotAllowed
+from django.http.response import JsonResponse
+
+# async versions of the variant endpoints, routed instead of the DRF ones when ASYNC_VIEWS is set.
+# each runs its independent queries at once on ibvl.async_queries threads, and renders the same json
+# the sync views do (json only: there is no browsable api here)
+
+
+def render(data, status=200):
+    return PrerenderedJSONResponse(data, status=status)
+
+
+def variant_exists(variant_id):
+    return Variant.objects.filter(variant_id=variant_id).exists()
+
+
+async def first_row(model, rows, variant_id):
+    """ first_for_variant on a query thread, None without a query when the row isn't wanted """
+    if rows is None:
+        return None
+    return await run_query(first_for_variant, model, rows, variant_id)
+
+
+def fields_error(request, *row_serializers):
+    """ (narrowed row serializers, an error response for a bad ?fields=, None otherwise) """
+    names, errors = requested_fields(request.GET.get("fields"))
+    narrowed, field_errors = sparse_rows(names, *row_serializers)
+    errors.extend(field_errors)
+    if len(errors) > 0:
+        return narrowed, JsonResponse({"errors": errors}, status=400)
+    return narrowed, None
+
+
+@cached_response('variant_details')
+async def variant_details_async(request, variant_id, **kwargs):
+    """ variant_details, with the variant, snv, both frequencies and annotations queried concurrently """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    database = request.GET.get("transcript_database", None)
+
+    (rows, gnomad_rows, variome_rows), error_response = fields_error(request, snv_rows, gnomad_frequency_rows, variome_frequency_rows)
+    if error_response is not None:
+        return error_response
+    if await run_query(definitely_missing, variant_id):
+        return JsonResponse({"errors": ["variant_id not found"]}, status=404)
+
+    exists, snv, gnomad_freq, variome_freq, (annotations, annotation_errors) = await asyncio.gather(
+        run_query(variant_exists, variant_id),
+        first_row(SNV, rows, variant_id),
+        first_row(GenomicGnomadFrequency, gnomad_rows, variant_id),
+        first_row(GenomicVariomeFrequency, variome_rows, variant_id),
+        run_query(get_annotations, variant_id, database),
+    )
+    if not exists:
+        return JsonResponse({"errors": ["variant_id not found"]}, status=404)
+
+    errors = []
+    data_out = {}
+    if rows is not None:
+        data_out["snv"] = snv
+        if snv is None:
+            errors.append("snv not found for this variant")
+    frequencies = {}
+    if gnomad_freq is not None:
+        frequencies["genomic_gnomad_freq"] = gnomad_freq
+    elif gnomad_rows is not None:
+        errors.append("genomic gnomad frequency not found for this variant")
+    if variome_freq is not None:
+        frequencies["genomic_ibvl_freq"] = variome_freq
+    elif variome_rows is not None:
+        errors.append("genomic variome frequency not found for this variant")
+    errors.extend(annotation_errors)
+
+    data_out["frequencies"] = frequencies
+    data_out["annotations"] = annotations
+    data_out["errors"] = errors
+    return render(data_out)
+
+
+@cached_response('snv_metadata')
+async def snv_metadata_async(request, variant_id, **kwargs):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    (rows,), error_response = fields_error(request, snv_rows)
+    if error_response is not None:
+        return error_response
+    if await run_query(definitely_missing, variant_id):
+        return render({"detail": "Not found."}, status=404)
+
+    snv = await first_row(SNV, rows, variant_id)
+    if snv is None:
+        return render({"detail": "Not found."}, status=404)
+    return render(snv)
+
+
+@cached_response('genomic_population_frequencies')
+async def genomic_population_frequencies_async(request, variant_id, **kwargs):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    (gnomad_rows, variome_rows), error_response = fields_error(request, gnomad_frequency_rows, variome_frequency_rows)
+    if error_response is not None:
+        return error_response
+    if await run_query(definitely_missing, variant_id):
+        return JsonResponse({"errors": ["variant_id not found"]}, status=404)
+
+    exists, gnomad_freq, variome_freq = await asyncio.gather(
+        run_query(variant_exists, variant_id),
+        first_row(GenomicGnomadFrequency, gnomad_rows, variant_id),
+        first_row(GenomicVariomeFrequency, variome_rows, variant_id),
+    )
+    if not exists:
+        return JsonResponse({"errors": ["variant_id not found"]}, status=404)
+
+    data_out = {}
+    errors = []
+    if gnomad_freq is not None:
+        data_out["genomic_gnomad_freq"] = gnomad_freq
+    elif gnomad_rows is not None:
+        errors.append("genomic gnomad frequency not found for this variant")
+    if variome_freq is not None:
+        data_out["genomic_ibvl_freq"] = variome_freq
+    elif variome_rows is not None:
+        errors.append("genomic variome frequency not found for this variant")
+    data_out["errors"] = errors
+    return render(data_out)
+
+
+@cached_response('snv_annotations')
+async def snv_annotations_async(request, variant_id, **kwargs):
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    database = request.GET.get("transcript_database", None)
+
+    transcripts_by_gene, errors = await run_query(get_annotations, variant_id, database)
+    return render({"annotations": transcripts_by_gene, "errors": errors})
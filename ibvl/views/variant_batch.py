@@ -0,0 +1,121 @@
+from django.conf import settings
+from ibvl.models import (
+    Variant,
+    SNV,
+    GenomicGnomadFrequency,
+    GenomicVariomeFrequency
+)
+from ibvl.serializers import (
+    snv_rows,
+    gnomad_frequency_rows,
+    variome_frequency_rows
+)
+from .snv_annotations import get_annotations_for_variants
+from .variant_rows import export_columns, first_by_variant, requested_fields, sparse_rows
+
+from ibvl.arrow import ARROW_RENDERERS, arrow_response, wants_arrow
+from ibvl.variant_bloom import maybe_present
+from ibvl.fast_json import VARIANT_RENDERERS, api_response
+from rest_framework.decorators import api_view, renderer_classes
+
+from django.http.response import JsonResponse
+
+# variant_ids per IN (...) query, keeps each statement a reasonable size
+LOOKUP_CHUNK_SIZE = 1000
+
+
+@api_view(['POST'])
+@renderer_classes(VARIANT_RENDERERS + ARROW_RENDERERS)
+def variant_batch(request, **kwargs):
+    """
+    snv metadata, population frequencies and optionally annotations for many variants.
+    body: {"variant_ids": [...], "annotations": false, "transcript_database": "E" | "R", "fields": ["af_tot", ...]}
+    every id gets a result, in the order given, with "found": false for ids that are not in the database.
+    "fields" limits the snvs and frequencies to those fields, leaving out (and not querying) the ones with none of them.
+    with an arrow Accept header it's an arrow stream of EXPORT_COLUMNS rows instead, one per snv of the ids found.
+    "fields" names the columns it has then (variant_id always comes first), and annotations can't be asked for
+    """
+
+    json = kwargs.get('JSON', False)
+
+    variant_ids = request.data.get("variant_ids") if isinstance(request.data, dict) else None
+    if not isinstance(variant_ids, list) or not all(isinstance(variant_id, str) for variant_id in variant_ids):
+        return JsonResponse({"errors": ["variant_ids must be a list of variant ids"]}, status=400)
+    if len(variant_ids) > settings.BATCH_MAX_VARIANTS:
+        return JsonResponse({"errors": ["at most " + str(settings.BATCH_MAX_VARIANTS) + " variant_ids per request"]}, status=400)
+
+    include_annotations = request.data.get("annotations", False) is True
+    database = request.data.get("transcript_database", None)
+    names, errors = requested_fields(request.data.get("fields"))
+    if wants_arrow(request):
+        columns, field_errors = export_columns(names)
+        if include_annotations:
+            field_errors.append("annotations are only available as json")
+    else:
+        (rows, gnomad_rows, variome_rows), field_errors = sparse_rows(names, snv_rows, gnomad_frequency_rows, variome_frequency_rows)
+    errors.extend(field_errors)
+    if len(errors) > 0:
+        return JsonResponse({"errors": errors}, status=400)
+
+    unique_ids = list(dict.fromkeys(variant_ids))
+    # ids the bloom filter rules out are answered "found": false without being looked up
+    lookup_ids = maybe_present(unique_ids)
+    if wants_arrow(request):
+        rows = []
+        for i in range(0, len(lookup_ids), LOOKUP_CHUNK_SIZE):
+            chunk = lookup_ids[i : i + LOOKUP_CHUNK_SIZE]
+            rows.extend(SNV.objects.filter(variant__variant_id__in=chunk).order_by('id').values_list(*columns.values()))
+        # in the order the ids were given (variant_id is the first column)
+        position = {variant_id: i for i, variant_id in enumerate(unique_ids)}
+        rows.sort(key=lambda row: position[row[0]])
+        return arrow_response(SNV, columns, rows)
+
+    variants = {}
+    snvs = {}
+    gnomad_freqs = {}
+    variome_freqs = {}
+    for i in range(0, len(lookup_ids), LOOKUP_CHUNK_SIZE):
+        chunk = lookup_ids[i : i + LOOKUP_CHUNK_SIZE]
+        chunk_variants = dict(Variant.objects.filter(variant_id__in=chunk).values_list('variant_id', 'id'))
+        variants.update(chunk_variants)
+        variant_pks = list(chunk_variants.values())
+        if len(variant_pks) == 0:
+            continue
+        if rows is not None:
+            snvs.update(first_by_variant(SNV, rows, variant__in=variant_pks))
+        if gnomad_rows is not None:
+            gnomad_freqs.update(first_by_variant(GenomicGnomadFrequency, gnomad_rows, variant__in=variant_pks))
+        if variome_rows is not None:
+            variome_freqs.update(first_by_variant(GenomicVariomeFrequency, variome_rows, variant__in=variant_pks))
+
+    annotations = {}
+    if include_annotations and len(variants) > 0:
+        annotations = get_annotations_for_variants(list(variants.values()), database)
+
+    results = {}
+    for variant_id, variant_pk in variants.items():
+        frequencies = {}
+        if variant_pk in gnomad_freqs:
+            frequencies["genomic_gnomad_freq"] = gnomad_freqs[variant_pk]
+        if variant_pk in variome_freqs:
+            frequencies["genomic_ibvl_freq"] = variome_freqs[variant_pk]
+        result = {
+            "variant_id": variant_id,
+            "found": True,
+        }
+        if rows is not None:
+            result["snv"] = snvs.get(variant_pk)
+        result["frequencies"] = frequencies
+        if include_annotations:
+            result["annotations"] = annotations.get(variant_pk, [])
+        results[variant_id] = result
+
+    data_out = {
+        "results": [results.get(variant_id, {"variant_id": variant_id, "found": False}) for variant_id in variant_ids],
+        "errors": [],
+    }
+
+    if json:
+        return JsonResponse(data_out)
+    else:
+        return api_response(request, data_out)
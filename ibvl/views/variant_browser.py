@@ -0,0 +1,86 @@
+import base64
+import binascii
+from django.conf import settings
+from ibvl.models import (
+    SNV,
+)
+from .variant_filters import snv_filters
+from .variant_rows import EXPORT_COLUMNS, serialize_with_worst, snv_results
+
+from ibvl.arrow import ARROW_RENDERERS, arrow_response, wants_arrow
+from ibvl.fast_json import VARIANT_RENDERERS, api_response
+from rest_framework.decorators import api_view, renderer_classes
+
+from django.http.response import JsonResponse
+
+
+def encode_cursor(snv_id):
+    """ opaque, so clients pass it back rather than building their own """
+    return base64.urlsafe_b64encode(("snv:" + str(snv_id)).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """ the snv id a cursor token continues after, None if it isn't one of ours """
+    try:
+        value = base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeError):
+        return None
+    if not value.startswith("snv:") or not value[4:].isdigit():
+        return None
+    return int(value[4:])
+
+
+@api_view(['GET'])
+@renderer_classes(VARIANT_RENDERERS + ARROW_RENDERERS)
+def variant_browser(request, **kwargs):
+    """
+    snvs with their frequencies, filtered by e.g. ?variome_af_lt=0.001&gnomad_af_popmax_lt=0.01&cadd_score_gt=20&genes=BRCA1
+    (see variant_filters for all of them), each with its variant's worst_consequence and worst_impact. keyset paginated by snv id: pass a page's "next" token as ?cursor=,
+    so every page costs the same however deep it is. with an arrow Accept header the page comes as an arrow stream
+    of EXPORT_COLUMNS rows, with "next" in its schema metadata
+    """
+
+    json = kwargs.get('JSON', False)
+
+    try:
+        limit = int(request.GET.get("limit", settings.FILTER_PAGE_SIZE))
+    except ValueError:
+        return JsonResponse({"errors": ["limit must be a number"]}, status=400)
+    limit = max(1, min(limit, settings.FILTER_MAX_ROWS))
+
+    filters, errors = snv_filters(request.GET)
+    if len(errors) > 0:
+        return JsonResponse({"errors": errors}, status=400)
+
+    queryset = SNV.objects.filter(*filters)
+    if request.GET.get("cursor"):
+        after_id = decode_cursor(request.GET["cursor"])
+        if after_id is None:
+            return JsonResponse({"errors": ["cursor must be the next token of a previous page"]}, status=400)
+        queryset = queryset.filter(id__gt=after_id)
+
+    if wants_arrow(request):
+        rows = list(queryset.order_by('id').values_list('id', *EXPORT_COLUMNS.values())[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0])
+        return arrow_response(SNV, EXPORT_COLUMNS, [row[1:] for row in rows], {"next": next_cursor or ""})
+
+    # one row past the page tells us whether there is a next one
+    snvs, worst = serialize_with_worst(queryset.order_by('id')[:limit + 1])
+    next_cursor = None
+    if len(snvs) > limit:
+        snvs = snvs[:limit]
+        next_cursor = encode_cursor(snvs[-1]["id"])
+
+    data_out = {
+        "variants": snv_results(snvs, worst),
+        "next": next_cursor,
+        "errors": [],
+    }
+
+    if json:
+        return JsonResponse(data_out)
+    else:
+        return api_response(request, data_out)
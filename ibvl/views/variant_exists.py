@@ -0,0 +1,47 @@
+from django.conf import settings
+from ibvl.models import (
+    Variant
+)
+from ibvl.variant_bloom import maybe_present
+from .variant_batch import LOOKUP_CHUNK_SIZE
+
+from ibvl.fast_json import VARIANT_RENDERERS, api_response
+from rest_framework.decorators import api_view, renderer_classes
+
+from django.http.response import JsonResponse
+
+
+@api_view(['GET', 'POST'])
+@renderer_classes(VARIANT_RENDERERS)
+def variants_exist(request, **kwargs):
+    """
+    whether each of many variants is in the database: POST {"variant_ids": [...]} or GET ?variant_ids=a,b.
+    ids the variant bloom filter rules out cost no queries, the others are looked up LOOKUP_CHUNK_SIZE at a time
+    """
+
+    json = kwargs.get('JSON', False)
+
+    if request.method == 'POST':
+        variant_ids = request.data.get("variant_ids") if isinstance(request.data, dict) else None
+    else:
+        variant_ids = [variant_id for variant_id in request.GET.get("variant_ids", "").split(",") if variant_id != ""]
+    if not isinstance(variant_ids, list) or not all(isinstance(variant_id, str) for variant_id in variant_ids):
+        return JsonResponse({"errors": ["variant_ids must be a list of variant ids"]}, status=400)
+    if len(variant_ids) > settings.EXISTS_MAX_VARIANTS:
+        return JsonResponse({"errors": ["at most " + str(settings.EXISTS_MAX_VARIANTS) + " variant_ids per request"]}, status=400)
+
+    candidates = maybe_present(dict.fromkeys(variant_ids))
+    found = set()
+    for i in range(0, len(candidates), LOOKUP_CHUNK_SIZE):
+        chunk = candidates[i : i + LOOKUP_CHUNK_SIZE]
+        found.update(Variant.objects.filter(variant_id__in=chunk).values_list('variant_id', flat=True))
+
+    data_out = {
+        "exists": {variant_id: variant_id in found for variant_id in variant_ids},
+        "errors": [],
+    }
+
+    if json:
+        return JsonResponse(data_out)
+    else:
+        return api_response(request, data_out)
@@ -0,0 +1,93 @@
+from decimal import Decimal, InvalidOperation
+from django.db.models import Exists, OuterRef, Q
+from ibvl.models import (
+    Severity,
+    GenomicVariomeFrequency,
+    GenomicGnomadFrequency,
+    VariantTranscript,
+)
+
+# ?param -> SNV lookup it bounds. strict inequalities, e.g. ?cadd_score_gt=20 is cadd_score > 20
+snv_number_filters = {
+    "cadd_score_gt": "cadd_score__gt",
+    "splice_ai_gt": "splice_ai__gt",
+}
+# ?param -> (frequency model, lookup)
+frequency_filters = {
+    "variome_af_lt": (GenomicVariomeFrequency, "af_tot__lt"),
+    "gnomad_af_lt": (GenomicGnomadFrequency, "af_tot__lt"),
+    "gnomad_af_popmax_lt": (GenomicGnomadFrequency, "af_popmax__lt"),
+}
+# ?param (comma separated) -> SNV lookup
+snv_list_filters = {
+    "var_type": "variant__var_type__in",
+    "impact": "variant__worst_impact__in",
+}
+
+
+def severity_number(consequence):
+    return Severity.objects.filter(consequence=consequence).values_list("severity_number", flat=True).first()
+
+
+def consequence_filters(params, consequence_field="worst_consequence", severity_field="worst_severity"):
+    """
+    queryset filters on a precomputed worst consequence, from ?worst_consequence=stop_gained (exactly)
+    and ?worst_consequence_at_most=missense_variant (that or more severe).
+    the fields are lookups from the queried model, e.g. "variant__worst_severity" for SNV.
+    returns (filters, errors)
+    """
+    filters = {}
+    errors = []
+    if params.get("worst_consequence"):
+        filters[consequence_field] = params["worst_consequence"]
+    if params.get("worst_consequence_at_most"):
+        number = severity_number(params["worst_consequence_at_most"])
+        if number is None:
+            errors.append("unknown consequence: " + params["worst_consequence_at_most"])
+        else:
+            # lower severity_number is more severe
+            filters[severity_field + "__lte"] = number
+    return filters, errors
+
+
+def number_param(params, name, errors):
+    try:
+        return Decimal(params[name])
+    except InvalidOperation:
+        errors.append(name + " must be a number")
+        return None
+
+
+def list_param(params, name):
+    return [value.strip() for value in params[name].split(",") if value.strip() != ""]
+
+
+def snv_filters(params):
+    """
+    filter expressions for an SNV queryset from the variant browser's query parameters:
+    the number and list filters above, ?genes=BRCA1,BRCA2 and the consequence filters. returns (filters, errors)
+    """
+    filters = []
+    errors = []
+    for name, lookup in snv_number_filters.items():
+        if params.get(name):
+            value = number_param(params, name, errors)
+            if value is not None:
+                filters.append(Q(**{lookup: value}))
+    for name, (model, lookup) in frequency_filters.items():
+        if params.get(name):
+            value = number_param(params, name, errors)
+            if value is not None:
+                # a semi-join, so a variant with several frequency rows can't come back twice
+                filters.append(Exists(model.objects.filter(variant=OuterRef("variant"), **{lookup: value})))
+    for name, lookup in snv_list_filters.items():
+        if params.get(name):
+            filters.append(Q(**{lookup: list_param(params, name)}))
+    if params.get("genes"):
+        genes = [gene.upper() for gene in list_param(params, "genes")]
+        filters.append(Exists(VariantTranscript.objects.filter(variant=OuterRef("variant"), transcript__gene__short_name__in=genes)))
+
+    consequences, consequence_errors = consequence_filters(params, "variant__worst_consequence", "variant__worst_severity")
+    filters.extend(Q(**{lookup: value}) for lookup, value in consequences.items())
+    errors.extend(consequence_errors)
+    return filters, errors
@@ -0,0 +1,141 @@
+from ibvl.models import (
+    GenomicGnomadFrequency,
+    GenomicVariomeFrequency
+)
+from ibvl.serializers import (
+    snv_rows,
+    gnomad_frequency_rows,
+    variome_frequency_rows
+)
+
+# the variant endpoints' data, serialized straight from .values_list() rows (see RowSerializer)
+
+# output column -> SNV lookup of the flat rows of exports and arrow responses.
+# frequencies come in through LEFT JOINs so each row is one flat tuple
+EXPORT_COLUMNS = {
+    "variant_id": "variant__variant_id",
+    "chr": "chr",
+    "pos": "pos",
+    "ref": "ref",
+    "alt": "alt",
+    "type": "type",
+    "dbsnp_id": "dbsnp_id",
+    "cadd_score": "cadd_score",
+    "splice_ai": "splice_ai",
+    "worst_consequence": "variant__worst_consequence",
+    "worst_impact": "variant__worst_impact",
+    "variome_af_tot": "variant__genomicvariomefrequency__af_tot",
+    "variome_ac_tot": "variant__genomicvariomefrequency__ac_tot",
+    "variome_an_tot": "variant__genomicvariomefrequency__an_tot",
+    "variome_hom_tot": "variant__genomicvariomefrequency__hom_tot",
+    "gnomad_af_tot": "variant__genomicgnomadfrequency__af_tot",
+    "gnomad_ac_tot": "variant__genomicgnomadfrequency__ac_tot",
+    "gnomad_an_tot": "variant__genomicgnomadfrequency__an_tot",
+    "gnomad_hom_tot": "variant__genomicgnomadfrequency__hom_tot",
+}
+
+
+def export_columns(names):
+    """
+    (EXPORT_COLUMNS narrowed to the requested field names, errors), variant_id always first so
+    rows can be matched to ids. names None leaves them whole
+    """
+    if names is None:
+        return EXPORT_COLUMNS, []
+    errors = ["unknown field " + name for name in names if name not in EXPORT_COLUMNS]
+    columns = {name: lookup for name, lookup in EXPORT_COLUMNS.items() if name == "variant_id" or name in names}
+    return columns, errors
+
+
+# the precomputed most severe consequence, which the region and browser results carry next to each variant_id
+WORST_COLUMNS = {
+    "worst_consequence": "variant__worst_consequence",
+    "worst_impact": "variant__worst_impact",
+}
+
+
+def serialize_with_worst(queryset):
+    """ (serialized snvs, {snv id: their variant's WORST_COLUMNS}), in one query """
+    rows = queryset.values_list(*snv_rows.columns, *WORST_COLUMNS.values())
+    width = len(snv_rows.columns)
+    snvs = []
+    worst = {}
+    for row in rows:
+        snv = snv_rows.to_representation(row)
+        snvs.append(snv)
+        worst[snv["id"]] = dict(zip(WORST_COLUMNS, row[width:]))
+    return snvs, worst
+
+
+def first_by_variant(model, rows, **filters):
+    """ {variant pk: serialized row} with the lowest id row of model for each variant matching filters, in one query """
+    result = {}
+    for row in model.objects.filter(**filters).order_by('id').values_list('variant', *rows.columns):
+        if row[0] not in result:
+            result[row[0]] = rows.to_representation(row, 1)
+    return result
+
+
+def first_for_variant(model, rows, variant_id):
+    """ the serialized lowest id row of model for a variant, None if it has none """
+    return next(iter(first_by_variant(model, rows, variant__variant_id=variant_id).values()), None)
+
+
+def requested_fields(value):
+    """
+    the field names of a ?fields=cadd_score,af_tot,variant.variant_id parameter (or a list of them),
+    None when there is no such parameter. (names, errors)
+    """
+    if value is None:
+        return None, []
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        return None, ["fields must be a comma separated list of field names"]
+    names = [name.strip() for name in value if name.strip() != ""]
+    if len(names) == 0:
+        return None, ["fields must name at least one field"]
+    return names, []
+
+
+def sparse_rows(names, *row_serializers):
+    """
+    ([row serializers narrowed to the requested field names], errors). each keeps the fields it has, and is None
+    when it has none of them: its table needn't be queried. errors name the fields none of them have.
+    names None leaves them whole
+    """
+    if names is None:
+        return list(row_serializers), []
+    narrowed = []
+    unknown = set(names)
+    for rows in row_serializers:
+        subset, missing = rows.only(names)
+        unknown.intersection_update(missing)
+        narrowed.append(subset if len(subset.columns) > 0 else None)
+    errors = ["unknown field " + name for name in names if name in unknown]
+    return narrowed, errors
+
+
+def snv_results(snvs, worst=None):
+    """
+    serialized snvs, each with its variant_id and frequencies. two queries, one per frequency table.
+    worst (from serialize_with_worst) adds each one's worst consequence and impact
+    """
+    variant_pks = [snv["variant"]["id"] for snv in snvs]
+    gnomad_freqs = first_by_variant(GenomicGnomadFrequency, gnomad_frequency_rows, variant__in=variant_pks)
+    variome_freqs = first_by_variant(GenomicVariomeFrequency, variome_frequency_rows, variant__in=variant_pks)
+    variants = []
+    for snv in snvs:
+        variant_pk = snv["variant"]["id"]
+        frequencies = {}
+        if variant_pk in gnomad_freqs:
+            frequencies["genomic_gnomad_freq"] = gnomad_freqs[variant_pk]
+        if variant_pk in variome_freqs:
+            frequencies["genomic_ibvl_freq"] = variome_freqs[variant_pk]
+        result = {"variant_id": snv["variant"]["variant_id"]}
+        if worst is not None:
+            result.update(worst[snv["id"]])
+        result["snv"] = snv
+        result["frequencies"] = frequencies
+        variants.append(result)
+    return variants